@@ -0,0 +1,64 @@
+"""Measure candidate filtering and "Similar to" lookups as the Lidarr library grows.
+
+Run from the repository root:
+
+    python benchmarks/bench_artist_index.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.chdir(tempfile.mkdtemp(prefix="listenarr-bench-"))
+
+from Listenarr import LidarrArtistIndex
+
+
+def make_library(size):
+    return [{"name": f"Library Artist {i}", "mbid": f"{i:08d}-0000-0000-0000-000000000000", "checked": False} for i in range(size)]
+
+
+def make_candidates(library, count):
+    step = max(1, len(library) // count)
+    return [{"artist_mbid": f"{i:08d}-0000-0000-0000-000000000001", "reference_mbid": library[(i * step) % len(library)]["mbid"]} for i in range(count)]
+
+
+def list_lookup(items, mbids, candidates):
+    for artist in candidates:
+        if artist["artist_mbid"] not in mbids:
+            for lidarr_artist in items:
+                if lidarr_artist["mbid"] == artist["reference_mbid"]:
+                    break
+
+
+def index_lookup(index, candidates):
+    for artist in candidates:
+        if artist["artist_mbid"] not in index:
+            index.get(artist["reference_mbid"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=100, help="Number of similar artists to filter per search")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed searches per library size")
+    args = parser.parse_args()
+
+    print(f"{'library':>8} {'list ms':>10} {'index ms':>10} {'add ms':>10}")
+    for size in (1000, 5000, 10000, 50000):
+        library = make_library(size)
+        candidates = make_candidates(library, args.candidates)
+        mbids = [item["mbid"] for item in library]
+        index = LidarrArtistIndex()
+        index.replace(library)
+
+        list_seconds = min(timeit.repeat(lambda: list_lookup(library, mbids, candidates), number=1, repeat=args.repeat))
+        index_seconds = min(timeit.repeat(lambda: index_lookup(index, candidates), number=1, repeat=args.repeat))
+        add_seconds = min(timeit.repeat(lambda: index.add(f"Added Artist {len(index)}", f"added-{len(index)}"), number=1, repeat=args.repeat))
+        print(f"{size:>8} {list_seconds * 1000:>10.2f} {index_seconds * 1000:>10.3f} {add_seconds * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
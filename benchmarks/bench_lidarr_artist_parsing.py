@@ -0,0 +1,68 @@
+"""Compare peak memory of loading the Lidarr artist list with response.json() and with the streaming parser.
+
+Run from the repository root:
+
+    python benchmarks/bench_lidarr_artist_parsing.py
+
+The stub serves a synthetic /api/v1/artist payload with the nested metadata Lidarr returns. Peak
+memory is traced with tracemalloc while each approach reduces the payload to the mbid to name
+mapping that get_artists_from_lidarr keeps.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp(prefix="listenarr-bench-"))
+
+import Listenarr
+from stub_server import StubServer
+
+
+def load_full(http_client, url):
+    response = http_client.get(url, timeout=60)
+    return {artist["foreignArtistId"]: artist["artistName"] for artist in response.json()}
+
+
+def load_streaming(http_client, url):
+    with http_client.get(url, timeout=60, stream=True) as response:
+        return {artist["foreignArtistId"]: artist["artistName"] for artist in http_client.iter_json_array(response)}
+
+
+def measure(func, http_client, url):
+    tracemalloc.start()
+    start = time.perf_counter()
+    artists = func(http_client, url)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return artists, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000], help="Library sizes served by the stub")
+    args = parser.parse_args()
+
+    http_client = Listenarr.HttpClient(pool_size=1, connect_timeout=10)
+    for size in args.sizes:
+        with StubServer(latency=0, library_size=size) as stub:
+            url = f"{stub.url}/api/v1/artist"
+            payload_mb = len(stub.httpd.library_body) / 1e6
+            print(f"{size} artists, {payload_mb:.1f} MB payload")
+            results = {}
+            for label, func in (("json", load_full), ("streaming", load_streaming)):
+                artists, elapsed, peak = measure(func, http_client, url)
+                results[label] = artists
+                print(f"  {label:>9}: {elapsed:.2f}s, peak {peak / 1e6:.1f} MB, {peak / size:.0f} bytes per artist")
+            if results["json"] != results["streaming"]:
+                raise SystemExit("Streaming parser returned different artists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare serial and batched ListenBrainz popularity lookups against a local stub server.
+
+Run from the repository root:
+
+    python benchmarks/bench_popularity_batching.py
+
+The serial run uses a single-worker engine so it makes one popularity request at a time. The
+batched and cached runs use the app's engine with listenbrainz_workers workers.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(tempfile.mkdtemp(prefix="listenarr-bench-"))
+
+import Listenarr
+from stub_server import StubServer
+
+
+def run_search(data_handler, batch_size, engine, clear_cache=True):
+    if clear_cache:
+        data_handler.listenbrainz_cache.clear()
+    data_handler.popularity_batch_size = batch_size
+    data_handler.engine = engine
+    job = Listenarr.SearchJob(["00000000-0000-0000-0000-000000000000"])
+    start = time.perf_counter()
+    data_handler.find_similar_artists(job)
+    return time.perf_counter() - start, len(job.recommended_artists)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--artists", type=int, default=100, help="Number of similar artists returned by the stub")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub latency per request in seconds")
+    parser.add_argument("--batch-size", type=int, default=25, help="Popularity batch size to compare against serial")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency, similar_artist_count=args.artists) as stub:
+        stub.point(Listenarr)
+        data_handler = Listenarr.data_handler
+        engine = data_handler.engine
+        serial_engine = Listenarr.ConcurrentEngine(1)
+
+        for label, batch_size, run_engine, clear_cache in (("serial", 1, serial_engine, True), ("batched", args.batch_size, engine, True), ("cached", args.batch_size, engine, False)):
+            requests_before = stub.request_count
+            elapsed, found = run_search(data_handler, batch_size, run_engine, clear_cache)
+            print(f"{label:>8}: {elapsed:.3f}s, {found} artists, {stub.request_count - requests_before} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Aggregate and rank synthetic similar-artists results from the cache at growing seed counts.
+
+Run from the repository root:
+
+    python benchmarks/bench_recommendation_ranking.py
+
+The ListenBrainz cache is filled once for the largest seed count, then each run feeds the ranker one
+cache chunk at a time the way find_similar_artists does. Peak memory is traced for every run and
+must stay flat as the seed count grows, because the ranker keeps at most max_candidates entries.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.chdir(tempfile.mkdtemp(prefix="listenarr-bench-"))
+
+from Listenarr import LISTENBRAINZ_SIMILAR_ARTISTS_ALGORITHM, ListenBrainzCache, RecommendationRanker
+
+
+def make_seed_results(seed_mbid, per_seed, candidate_pool, rng):
+    # The everywhere artist is recommended by every seed with a middling score so it must rank first.
+    similar_artists = [{"artist_mbid": "00000000-0000-0000-0000-00000000000f", "name": "Everywhere Artist", "reference_mbid": seed_mbid, "score": 50}]
+    for candidate_index in rng.sample(range(1, candidate_pool), per_seed - 1):
+        similar_artists.append({"artist_mbid": f"{candidate_index:08d}-0000-0000-0000-000000000001", "name": f"Candidate {candidate_index}", "reference_mbid": seed_mbid, "score": rng.randint(1, 100)})
+    return similar_artists
+
+
+def fill_cache(cache, seed_mbids, per_seed, candidate_pool, rng):
+    for i in range(0, len(seed_mbids), 500):
+        chunk = seed_mbids[i : i + 500]
+        similar_artists = [artist for seed_mbid in chunk for artist in make_seed_results(seed_mbid, per_seed, candidate_pool, rng)]
+        cache.set_similar_artists(chunk, LISTENBRAINZ_SIMILAR_ARTISTS_ALGORITHM, similar_artists)
+
+
+def run(cache, seed_mbids, library, args, rng):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ranker = RecommendationRanker(library, args.max_candidates)
+    missing_seeds = []
+    for similar_artists in cache.iter_similar_artists(seed_mbids, LISTENBRAINZ_SIMILAR_ARTISTS_ALGORITHM, missing_seeds, args.chunk_size):
+        ranker.add(similar_artists)
+        del similar_artists
+    aggregate_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    candidates = ranker.top_candidates(args.limit * 2)
+    popularity = {candidate["artist_mbid"]: {"total_listen_count": rng.randint(0, 10_000_000)} for candidate in candidates}
+    ranked = ranker.rank(candidates, popularity, args.limit)
+    rank_seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert not missing_seeds, "Every seed should be served from the cache"
+    assert ranked[0]["artist_mbid"] == "00000000-0000-0000-0000-00000000000f", "Artist recommended by every seed should rank first"
+    assert ranked[0]["seed_count"] == len(seed_mbids)
+    assert len(ranked) == args.limit
+    assert not any(candidate["artist_mbid"] in library for candidate in ranked), "Library artists must be excluded"
+    assert len({candidate["artist_mbid"] for candidate in ranked}) == len(ranked), "Ranked candidates must be unique"
+    return aggregate_seconds, rank_seconds, peak_bytes, len(ranker)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1000, 2500, 10000], help="Numbers of library artists used as seeds")
+    parser.add_argument("--per-seed", type=int, default=100, help="Similar artists returned per seed")
+    parser.add_argument("--candidate-pool", type=int, default=200000, help="Number of distinct candidate artists")
+    parser.add_argument("--limit", type=int, default=100, help="Number of recommendations to keep")
+    parser.add_argument("--max-candidates", type=int, default=20000, help="Candidates the ranker keeps between chunks")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Seeds read from the cache per chunk")
+    parser.add_argument("--max-growth", type=float, default=1.5, help="Allowed ratio between the largest and smallest peak memory")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    library = {f"{i:08d}-0000-0000-0000-000000000001" for i in range(1, args.candidate_pool, 97)}
+    seed_mbids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(max(args.seeds))]
+    cache = ListenBrainzCache("listenbrainz_cache.db", ttl_seconds=3600, max_entries=len(seed_mbids))
+    start = time.perf_counter()
+    fill_cache(cache, seed_mbids, args.per_seed, args.candidate_pool, rng)
+    print(f"filled cache with {len(seed_mbids)} seeds x {args.per_seed} similar artists in {time.perf_counter() - start:.1f}s")
+
+    peaks = []
+    for seeds in sorted(args.seeds):
+        aggregate_seconds, rank_seconds, peak_bytes, kept = run(cache, seed_mbids[:seeds], library, args, rng)
+        peaks.append(peak_bytes)
+        print(f"seeds: {seeds}, suggestions: {seeds * args.per_seed}, kept candidates: {kept}, aggregate: {aggregate_seconds:.2f}s, rank top {args.limit}: {rank_seconds * 1000:.1f}ms, peak memory: {peak_bytes / 1024 / 1024:.1f} MiB")
+
+    assert max(peaks) <= min(peaks) * args.max_growth, f"Peak memory grew from {min(peaks) / 1024 / 1024:.1f} MiB to {max(peaks) / 1024 / 1024:.1f} MiB"
+    print(f"peak memory flat within {args.max_growth}x across {len(peaks)} seed counts")
+
+
+if __name__ == "__main__":
+    main()
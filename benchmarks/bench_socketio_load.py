@@ -0,0 +1,201 @@
+"""Simulate concurrent users running search and add flows over Socket.IO against stub upstreams.
+
+Run from the repository root:
+
+    python benchmarks/bench_socketio_load.py --users 10 --iterations 3
+
+The app runs in a child process on the gevent server, the same way gunicorn runs it, with
+Lidarr, ListenBrainz and MusicBrainz served by the local stub. Each simulated user loads the
+sidebar, fetches a page of library artists, starts a search for them, waits for it to finish and
+then adds some of the recommendations. Latency percentiles are reported per flow.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def serve(args):
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    import tempfile
+
+    sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src"))
+    sys.path.insert(0, BENCHMARKS_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="listenarr-bench-"))
+
+    import Listenarr
+    from stub_server import StubServer
+
+    latencies = {"lidarr": args.lidarr_latency, "listenbrainz": args.listenbrainz_latency, "musicbrainz": args.musicbrainz_latency}
+    stub = StubServer(similar_artist_count=args.similar_artists, library_size=args.library_size, latencies=latencies).__enter__()
+    stub.point(Listenarr)
+    Listenarr.data_handler.get_artists_from_lidarr()
+    print(f"ready {len(Listenarr.data_handler.lidarr_artists)}", flush=True)
+    if not args.verbose:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+    Listenarr.socketio.run(Listenarr.app, host="127.0.0.1", port=args.port, log_output=False)
+
+
+class User:
+    def __init__(self, url, seeds, adds, timeout):
+        import socketio
+
+        self.client = socketio.Client()
+        self.url = url
+        self.seeds = seeds
+        self.adds = adds
+        self.timeout = timeout
+        self.sidebar = None
+        self.page = None
+        self.results = {}
+        self.first_results_at = None
+        self.pending_adds = set()
+        self.sidebar_loaded = threading.Event()
+        self.page_loaded = threading.Event()
+        self.finished = threading.Event()
+        self.added = threading.Event()
+        self.client.on("lidarr_sidebar_update", self.on_sidebar)
+        self.client.on("lidarr_page_loaded", self.on_page)
+        self.client.on("more_artists_loaded", self.on_artists)
+        self.client.on("finished_finding", lambda *args: self.finished.set())
+        self.client.on("refresh_artist", self.on_refresh)
+
+    def on_sidebar(self, data):
+        self.sidebar = data
+        self.sidebar_loaded.set()
+
+    def on_page(self, data):
+        self.page = data
+        self.page_loaded.set()
+
+    def on_artists(self, artists):
+        if self.first_results_at is None:
+            self.first_results_at = time.perf_counter()
+        for artist in artists:
+            self.results[artist["Mbid"]] = artist
+
+    def on_refresh(self, artist):
+        if artist["Status"] not in ("Queued", "Adding"):
+            self.pending_adds.discard(artist["Mbid"])
+            if not self.pending_adds:
+                self.added.set()
+
+    def wait(self, event, flow):
+        if not event.wait(self.timeout):
+            raise TimeoutError(f"{flow} timed out after {self.timeout}s")
+
+    def run(self, iterations, timings, errors):
+        try:
+            self.client.connect(self.url)
+            for _ in range(iterations):
+                self.sidebar_loaded.clear()
+                start = time.perf_counter()
+                self.client.emit("get_lidarr_artists")
+                self.wait(self.sidebar_loaded, "sidebar")
+                timings["sidebar"].append(time.perf_counter() - start)
+
+                self.page_loaded.clear()
+                start = time.perf_counter()
+                self.client.emit("lidarr_page", {"offset": random.randrange(max(1, self.sidebar["Total"] - self.seeds)), "limit": self.seeds, "filter": ""})
+                self.wait(self.page_loaded, "page")
+                timings["page"].append(time.perf_counter() - start)
+
+                seeds = [item["mbid"] for item in self.page["Items"]]
+                self.results = {}
+                self.first_results_at = None
+                self.finished.clear()
+                start = time.perf_counter()
+                self.client.emit("start_req", seeds)
+                self.wait(self.finished, "search")
+                timings["search"].append(time.perf_counter() - start)
+                if self.first_results_at is not None:
+                    timings["first_results"].append(self.first_results_at - start)
+
+                candidates = [mbid for mbid, artist in self.results.items() if not artist["Status"]]
+                self.pending_adds = set(random.sample(candidates, min(self.adds, len(candidates))))
+                if self.pending_adds:
+                    self.added.clear()
+                    start = time.perf_counter()
+                    self.client.emit("bulk_adder", list(self.pending_adds))
+                    self.wait(self.added, "add")
+                    timings["add"].append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            self.client.disconnect()
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(percent / 100 * (len(values) - 1)))]
+
+
+def run_load(args):
+    command = [sys.executable, os.path.abspath(__file__), "--serve"] + sys.argv[1:]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    try:
+        ready = server.stdout.readline().split()
+        if not ready or ready[0] != "ready":
+            raise SystemExit("Listenarr failed to start")
+        print(f"Listenarr ready with {ready[1]} library artists, {args.users} users x {args.iterations} iterations")
+
+        timings = {"sidebar": [], "page": [], "first_results": [], "search": [], "add": []}
+        errors = []
+        url = f"http://127.0.0.1:{args.port}"
+        users = [User(url, args.seeds, args.adds, args.timeout) for _ in range(args.users)]
+        threads = [threading.Thread(target=user.run, args=(args.iterations, timings, errors)) for user in users]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"{'flow':>14} {'count':>7} {'per sec':>9} {'p50':>9} {'p99':>9}")
+        for flow, values in timings.items():
+            if values:
+                print(f"{flow:>14} {len(values):>7} {len(values) / elapsed:>9.2f} {percentile(values, 50):>8.3f}s {percentile(values, 99):>8.3f}s")
+        print(f"{'total':>14} {elapsed:.2f}s, {len(errors)} errors")
+        for error in errors[:10]:
+            print(f"  {error}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="Number of concurrent Socket.IO clients")
+    parser.add_argument("--iterations", type=int, default=3, help="Search and add flows run by each user")
+    parser.add_argument("--seeds", type=int, default=10, help="Library artists selected for each search")
+    parser.add_argument("--adds", type=int, default=3, help="Recommendations added after each search")
+    parser.add_argument("--library-size", type=int, default=1000, help="Artists returned by the stub Lidarr library")
+    parser.add_argument("--similar-artists", type=int, default=20, help="Similar artists returned by the stub for each seed")
+    parser.add_argument("--lidarr-latency", type=float, default=0.02, help="Stub Lidarr latency per request in seconds")
+    parser.add_argument("--listenbrainz-latency", type=float, default=0.05, help="Stub ListenBrainz latency per request in seconds")
+    parser.add_argument("--musicbrainz-latency", type=float, default=0.05, help="Stub MusicBrainz latency per request in seconds")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the Listenarr child process")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for each flow before counting an error")
+    parser.add_argument("--verbose", action="store_true", help="Show the Listenarr log and access log")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+    else:
+        run_load(args)
+
+
+if __name__ == "__main__":
+    main()
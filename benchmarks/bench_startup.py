@@ -0,0 +1,132 @@
+"""Measure how quickly a freshly started Listenarr serves the page and the sidebar from its warm-start snapshot.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+
+Each run starts gunicorn with the same worker class as the Docker image against a config folder
+holding a saved Lidarr library and recommendations. gunicorn accepts connections before its worker
+has imported the app, so the script waits for /metrics to answer and then times the first page
+render and the first side_bar_opened round trip. Time spent booting Python, gunicorn and Flask
+before that point is reported separately.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def write_config(config_folder, library_size, recommendations):
+    os.makedirs(config_folder, exist_ok=True)
+    library = [[f"Library Artist {i}", f"{i:08d}-0000-0000-0000-000000000002"] for i in range(library_size)]
+    with open(os.path.join(config_folder, "lidarr_artists.json"), "w") as json_file:
+        json.dump(library, json_file, separators=(",", ":"))
+    saved = {
+        "seed_mbids": [mbid for _, mbid in library],
+        "recommended_artists": [
+            {"Name": f"Similar Artist {i}", "Mbid": f"{i:08d}-0000-0000-0000-000000000001", "Status": "", "Similar_To": "Similar to Library Artist 0", "Popularity": "123K listens", "Followers": "7.9K users"}
+            for i in range(recommendations)
+        ],
+        "updated_at": time.time(),
+    }
+    with open(os.path.join(config_folder, "recommendations.json"), "w") as json_file:
+        json.dump(saved, json_file)
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("gunicorn exited before listening")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.005)
+    raise SystemExit("gunicorn did not start listening")
+
+
+def time_first_requests(url):
+    import requests
+    import socketio
+
+    requests.get(f"{url}/metrics").raise_for_status()
+    app_loaded = time.perf_counter()
+
+    start = time.perf_counter()
+    response = requests.get(url)
+    response.raise_for_status()
+    render_seconds = time.perf_counter() - start
+
+    sidebar_loaded = threading.Event()
+    client = socketio.Client()
+    client.on("lidarr_sidebar_update", lambda data: sidebar_loaded.set())
+    client.connect(url)
+    try:
+        start = time.perf_counter()
+        client.emit("side_bar_opened")
+        if not sidebar_loaded.wait(10):
+            raise SystemExit("side_bar_opened was not answered")
+        sidebar_seconds = time.perf_counter() - start
+    finally:
+        client.disconnect()
+    return app_loaded, render_seconds, sidebar_seconds
+
+
+def run_once(workdir, port):
+    command = [
+        sys.executable, "-m", "gunicorn", "--workers=1", "--threads=4", f"--bind=127.0.0.1:{port}",
+        "--graceful-timeout=1",
+        "--worker-class=geventwebsocket.gunicorn.workers.GeventWebSocketWorker", f"--pythonpath={SRC_DIR}", "Listenarr:app",
+    ]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port, process)
+        app_loaded, render_seconds, sidebar_seconds = time_first_requests(f"http://127.0.0.1:{port}")
+        return app_loaded - start, render_seconds, sidebar_seconds
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--library-size", type=int, default=5000, help="Artists in the saved Lidarr snapshot")
+    parser.add_argument("--recommendations", type=int, default=100, help="Saved recommendations replayed on connect")
+    parser.add_argument("--port", type=int, default=5056, help="Port for gunicorn")
+    parser.add_argument("--target-ms", type=float, default=100, help="Budget for the first render and side_bar_opened")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="listenarr-bench-")
+    config_folder = os.path.join(workdir, "config")
+    write_config(config_folder, args.library_size, args.recommendations)
+
+    results = []
+    for run in range(args.runs):
+        results.append(run_once(workdir, args.port))
+        loaded_seconds, render_seconds, sidebar_seconds = results[-1]
+        print(f"run {run + 1}: app loaded after {loaded_seconds * 1000:.0f}ms, first render {render_seconds * 1000:.1f}ms, side_bar_opened {sidebar_seconds * 1000:.1f}ms")
+        if run == 0:
+            settings_mtime = os.path.getmtime(os.path.join(config_folder, "settings_config.json"))
+
+    settings_rewritten = os.path.getmtime(os.path.join(config_folder, "settings_config.json")) != settings_mtime
+    render_median = statistics.median(result[1] for result in results) * 1000
+    sidebar_median = statistics.median(result[2] for result in results) * 1000
+    print(f"median: app loaded after {statistics.median(result[0] for result in results) * 1000:.0f}ms, first render {render_median:.1f}ms, side_bar_opened {sidebar_median:.1f}ms")
+    print(f"settings_config.json rewritten after the first boot: {'yes' if settings_rewritten else 'no'}")
+    print(f"within {args.target_ms:.0f}ms budget: {'yes' if max(render_median, sidebar_median) < args.target_ms else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
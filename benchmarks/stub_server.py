@@ -0,0 +1,170 @@
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+
+def make_similar_artists(count, reference_mbid="00000000-0000-0000-0000-000000000000", offset=0):
+    return [
+        {
+            "artist_mbid": f"{offset + i:08d}-0000-0000-0000-000000000001",
+            "name": f"Similar Artist {offset + i}",
+            "reference_mbid": reference_mbid,
+            "score": count - i,
+        }
+        for i in range(count)
+    ]
+
+
+def make_library(count):
+    return [
+        {
+            "id": i + 1,
+            "artistName": f"Library Artist {i}",
+            "foreignArtistId": f"{i:08d}-0000-0000-0000-000000000002",
+            "status": "continuing",
+            "overview": "A synthetic artist used by the Listenarr benchmarks. " * 8,
+            "artistType": "Group",
+            "disambiguation": "",
+            "path": f"/music/Library Artist {i}",
+            "qualityProfileId": 1,
+            "metadataProfileId": 1,
+            "monitored": True,
+            "genres": ["Rock", "Alternative"],
+            "images": [{"coverType": "poster", "url": f"/MediaCover/{i + 1}/poster.jpg"}],
+            "links": [{"url": f"https://musicbrainz.org/artist/{i:08d}-0000-0000-0000-000000000002", "name": "musicbrainz"}],
+            "statistics": {"albumCount": 5, "trackFileCount": 50, "trackCount": 60, "totalTrackCount": 60, "sizeOnDisk": 500000000, "percentOfTracks": 83.3},
+        }
+        for i in range(count)
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_xml(self, body, status=200):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def respond_after(self, service):
+        time.sleep(self.server.latencies.get(service, self.server.latency))
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.request_counts[service] = self.server.request_counts.get(service, 0) + 1
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path.startswith("/ws/2/artist/"):
+            self.respond_after("musicbrainz")
+            mbid = escape(path.rsplit("/", 1)[-1])
+            self.send_xml(f'<?xml version="1.0" encoding="UTF-8"?><metadata xmlns="http://musicbrainz.org/ns/mmd-2.0#"><artist id="{mbid}" type="Group"><name>MusicBrainz Artist {mbid[:8]}</name><sort-name>MusicBrainz Artist {mbid[:8]}</sort-name></artist></metadata>')
+            return
+
+        self.respond_after("lidarr")
+        if path == "/api/v1/artist":
+            body = self.server.library_body
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif path == "/api/v1/system/status":
+            self.send_json({"appName": "Lidarr", "version": "2.0.0.0", "isDebug": False})
+        elif path == "/api/v1/metadataprofile":
+            self.send_json([{"id": 1, "name": "Standard"}])
+        elif path == "/api/v1/qualityprofile":
+            self.send_json([{"id": 1, "name": "Any"}])
+        elif path == "/api/v1/rootfolder":
+            self.send_json([{"id": 1, "path": "/music"}])
+        else:
+            self.send_json({"error": "Not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"null")
+
+        if self.path.startswith("/api/v1/artist"):
+            self.respond_after("lidarr")
+            with self.server.lock:
+                already_added = payload["foreignArtistId"] in self.server.added_mbids
+                self.server.added_mbids.add(payload["foreignArtistId"])
+            if already_added:
+                self.send_json([{"propertyName": "ForeignArtistId", "errorMessage": "This artist has already been added."}], status=400)
+            else:
+                self.send_json({**payload, "id": len(self.server.added_mbids)}, status=201)
+            return
+
+        self.respond_after("listenbrainz")
+        if self.path.startswith("/similar-artists/json"):
+            similar_artists = []
+            for seed_mbid in payload[0]["artist_mbids"]:
+                offset = zlib.crc32(seed_mbid.encode()) % self.server.similar_artist_pool
+                similar_artists.extend(make_similar_artists(self.server.similar_artist_count, seed_mbid, offset))
+            self.send_json(similar_artists)
+        elif self.path.startswith("/1/popularity/artist"):
+            self.send_json([{"artist_mbid": mbid, "total_listen_count": 123456, "total_user_count": 7890} for mbid in payload["artist_mbids"]])
+        else:
+            self.send_json({"error": "Not found"}, status=404)
+
+
+class StubServer:
+    def __init__(self, latency=0.05, similar_artist_count=100, library_size=100, similar_artist_pool=1000, latencies=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.latencies = latencies or {}
+        self.httpd.similar_artist_count = similar_artist_count
+        self.httpd.similar_artist_pool = similar_artist_pool
+        self.httpd.library_body = json.dumps(make_library(library_size)).encode()
+        self.httpd.added_mbids = set()
+        self.httpd.lock = threading.Lock()
+        self.httpd.request_count = 0
+        self.httpd.request_counts = {}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="Stub_Server_Thread", daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def request_count(self):
+        return self.httpd.request_count
+
+    @property
+    def request_counts(self):
+        return dict(self.httpd.request_counts)
+
+    def point(self, listenarr):
+        listenarr.LISTENBRAINZ_SIMILAR_ARTISTS_URL = f"{self.url}/similar-artists/json"
+        listenarr.LISTENBRAINZ_POPULARITY_URL = f"{self.url}/1/popularity/artist"
+        listenarr.data_handler.lidarr_address = self.url
+        listenarr.data_handler.lidarr_api_key = "benchmark"
+        listenarr.data_handler.ensure_services()
+        listenarr.data_handler.musicbrainz.set_hostname(self.url.removeprefix("http://"), use_https=False)
+        listenarr.data_handler.musicbrainz.set_rate_limit(False)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
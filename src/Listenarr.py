@@ -1,14 +1,673 @@
+# Running this file directly serves on gevent like the gunicorn worker does, so patch before anything imports threading or sockets.
+if __name__ == "__main__":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import codecs
+import hashlib
+import heapq
 import json
 import logging
+import math
 import os
+import queue
+import sqlite3
+import tempfile
 import threading
-from flask import Flask, render_template
+import time
+from contextlib import contextmanager
+from functools import wraps
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from flask import Flask, Response, render_template, request
 from flask_socketio import SocketIO
 import requests
-import musicbrainzngs
+from requests.adapters import HTTPAdapter
 
 APP_NAME = "Listenarr"
 APP_VERSION = "0.1.1"
+LISTENBRAINZ_SIMILAR_ARTISTS_URL = "https://labs.api.listenbrainz.org/similar-artists/json"
+LISTENBRAINZ_POPULARITY_URL = "https://api.listenbrainz.org/1/popularity/artist"
+LISTENBRAINZ_SIMILAR_ARTISTS_ALGORITHM = "session_based_days_7500_session_300_contribution_5_threshold_10_limit_100_filter_True_skip_30"
+
+class Metrics:
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.in_flight = {}
+        self.gauges = {}
+        self.help = {}
+
+    def label_key(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def format_labels(self, labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        values = ",".join(f'{key}="{str(value).replace("\\", "\\\\").replace('"', '\\"')}"' for key, value in pairs)
+        return f"{{{values}}}"
+
+    def observe(self, name, seconds, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            histogram = self.histograms.setdefault(name, {}).setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def increment(self, name, amount=1, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            counters = self.counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + amount
+
+    def gauge(self, name, help_text, func):
+        self.gauges[name] = func
+        self.help[name] = help_text
+
+    @contextmanager
+    def time(self, name, **labels):
+        key = self.label_key(labels)
+        in_flight_name = name.removesuffix("_seconds") + "_in_flight"
+        with self.lock:
+            in_flight = self.in_flight.setdefault(in_flight_name, {})
+            in_flight[key] = in_flight.get(key, 0) + 1
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment(name.removesuffix("_seconds") + "_errors_total", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+            with self.lock:
+                self.in_flight[in_flight_name][key] -= 1
+
+    def timed(self, name, **labels):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(name, **labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(self.buckets, histogram["buckets"]):
+                        lines.append(f"{name}_bucket{self.format_labels(key, [("le", bound)])} {count}")
+                    lines.append(f"{name}_bucket{self.format_labels(key, [("le", "+Inf")])} {histogram["count"]}")
+                    lines.append(f"{name}_sum{self.format_labels(key)} {histogram["sum"]}")
+                    lines.append(f"{name}_count{self.format_labels(key)} {histogram["count"]}")
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{self.format_labels(key)} {value}")
+            for name, series in sorted(self.in_flight.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{self.format_labels(key)} {value}")
+        for name, func in sorted(self.gauges.items()):
+            try:
+                value = func()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def write_json_file(path, data, **kwargs):
+    # Write a temporary file beside the target and swap it in, so a crash mid-write never leaves a truncated file.
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as json_file:
+            json.dump(data, json_file, **kwargs)
+            json_file.flush()
+            os.fsync(json_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def gevent_patched():
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched("socket")
+    except ImportError:
+        return False
+
+class ConcurrentEngine:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+
+    def imap_unordered(self, func, items, stop_event):
+        results = queue.Queue()
+
+        def run(item):
+            try:
+                results.put((item, func(item), None))
+            except Exception as e:
+                results.put((item, None, e))
+
+        if gevent_patched():
+            import gevent
+            from gevent.pool import Pool
+
+            pool = Pool(self.concurrency)
+            feeder = gevent.spawn(lambda: [pool.spawn(run, item) for item in items])
+
+            def cancel():
+                feeder.kill(block=False)
+                pool.kill(block=False)
+
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="Engine_Thread")
+            for item in items:
+                executor.submit(run, item)
+
+            def cancel():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        try:
+            remaining = len(items)
+            while remaining and not stop_event.is_set():
+                try:
+                    result = results.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                remaining -= 1
+                yield result
+
+        finally:
+            cancel()
+
+class HttpClient:
+    def __init__(self, pool_size, connect_timeout):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.sessions = {}
+        self.host_stats = {}
+        self.lock = threading.Lock()
+
+    def get_session(self, host):
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+                self.host_stats[host] = {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            return session
+
+    def request(self, method, url, timeout=None, **kwargs):
+        host = urlparse(url).netloc
+        session = self.get_session(host)
+        if timeout is not None:
+            timeout = (min(self.connect_timeout, timeout), timeout)
+        failed = False
+        start = time.perf_counter()
+        try:
+            with metrics.time("listenarr_upstream_request_seconds", host=host, method=method):
+                response = session.request(method, url, timeout=timeout, **kwargs)
+            metrics.increment("listenarr_upstream_responses_total", host=host, code=response.status_code)
+            return response
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                stats = self.host_stats[host]
+                stats["requests"] += 1
+                stats["errors"] += failed
+                stats["total_seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def iter_json_array(self, response, chunk_size=65536):
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+        buffer = ""
+        position = 0
+        started = False
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+            position = 0
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if position >= len(buffer):
+                    break
+                if not started:
+                    if buffer[position] != "[":
+                        raise ValueError("Response is not a JSON array")
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break
+                # A number cut off by the chunk boundary still decodes, so wait until a delimiter follows the element.
+                if end >= len(buffer) or buffer[end] not in " \t\r\n,]":
+                    break
+                position = end
+                yield item
+        raise ValueError("Response ended before the JSON array was closed")
+
+    def stats(self):
+        with self.lock:
+            return {
+                host: {**stats, "average_seconds": stats["total_seconds"] / stats["requests"] if stats["requests"] else 0.0}
+                for host, stats in self.host_stats.items()
+            }
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions = {}
+
+class LidarrArtistIndex:
+    def __init__(self):
+        self.items = []
+        self.by_mbid = {}
+        self.version = 0
+        self.saved_version = 0
+        self.lock = threading.RLock()
+
+    def sort_key(self, item):
+        return item["name"].lower()
+
+    def replace(self, items):
+        items = sorted(items, key=self.sort_key)
+        with self.lock:
+            self.items = items
+            self.by_mbid = {item["mbid"]: item for item in items}
+            self.version += 1
+
+    def add(self, name, mbid):
+        with self.lock:
+            if mbid in self.by_mbid:
+                return self.by_mbid[mbid]
+            item = {"name": name, "mbid": mbid}
+            insort(self.items, item, key=self.sort_key)
+            self.by_mbid[mbid] = item
+            self.version += 1
+            return item
+
+    def remove(self, mbid):
+        with self.lock:
+            item = self.by_mbid.pop(mbid, None)
+            if item is None:
+                return None
+            index = bisect_left(self.items, self.sort_key(item), key=self.sort_key)
+            while self.items[index] is not item:
+                index += 1
+            del self.items[index]
+            self.version += 1
+            return item
+
+    def sync(self, artists):
+        with self.lock:
+            removed = [mbid for mbid in self.by_mbid if mbid not in artists]
+            added = {mbid: name for mbid, name in artists.items() if mbid not in self.by_mbid}
+            renamed = {mbid: name for mbid, name in artists.items() if mbid in self.by_mbid and self.by_mbid[mbid]["name"] != name}
+
+            if len(removed) + len(added) + len(renamed) > max(100, len(self.items) // 10):
+                self.replace([{"name": name, "mbid": mbid} for mbid, name in artists.items()])
+            else:
+                for mbid in removed:
+                    self.remove(mbid)
+                for mbid, name in renamed.items():
+                    self.remove(mbid)
+                    self.add(name, mbid)
+                for mbid, name in added.items():
+                    self.add(name, mbid)
+
+            return len(added), len(removed), len(renamed)
+
+    def load_snapshot(self, snapshot_file):
+        with open(snapshot_file, "r") as json_file:
+            self.replace([{"name": name, "mbid": mbid} for name, mbid in json.load(json_file)])
+        self.saved_version = self.version
+
+    def save_snapshot(self, snapshot_file):
+        with self.lock:
+            if self.saved_version == self.version:
+                return False
+            version = self.version
+            snapshot = [[item["name"], item["mbid"]] for item in self.items]
+        write_json_file(snapshot_file, snapshot, separators=(",", ":"))
+        self.saved_version = version
+        return True
+
+    def filter(self, text):
+        text = text.strip().lower()
+        with self.lock:
+            if not text:
+                return list(self.items)
+            return [item for item in self.items if text in item["name"].lower()]
+
+    def get(self, mbid):
+        return self.by_mbid.get(mbid)
+
+    def mbids(self):
+        return list(self.by_mbid)
+
+    def __contains__(self, mbid):
+        return mbid in self.by_mbid
+
+    def __len__(self):
+        return len(self.items)
+
+class RecommendationRanker:
+    def __init__(self, exclude_mbids=(), max_candidates=None):
+        self.exclude_mbids = exclude_mbids
+        self.max_candidates = max_candidates
+        self.candidates = {}
+        self.max_score = 0
+
+    def prune(self):
+        # Drop the weakest candidates once the table doubles, so memory is bounded by max_candidates rather than the seed count.
+        if self.max_candidates and len(self.candidates) > 2 * self.max_candidates:
+            self.candidates = {candidate["artist_mbid"]: candidate for candidate in self.top_candidates(self.max_candidates)}
+
+    def add(self, similar_artists):
+        for artist in similar_artists:
+            mbid = artist["artist_mbid"]
+            if mbid in self.exclude_mbids:
+                continue
+            score = artist.get("score") or 0
+            self.max_score = max(self.max_score, score)
+            candidate = self.candidates.get(mbid)
+            if candidate is None:
+                self.candidates[mbid] = {"name": artist["name"], "artist_mbid": mbid, "references": [(score, artist["reference_mbid"])], "seed_count": 1, "score_total": score}
+                continue
+            candidate["seed_count"] += 1
+            candidate["score_total"] += score
+            references = candidate["references"]
+            if len(references) < 3 or score > references[-1][0]:
+                references.append((score, artist["reference_mbid"]))
+                references.sort(reverse=True)
+                del references[3:]
+        self.prune()
+
+    def base_score(self, candidate):
+        # Each recommending seed counts once, plus its similarity relative to the strongest match seen.
+        return candidate["seed_count"] + candidate["score_total"] / (self.max_score or 1)
+
+    def final_score(self, candidate, popularity):
+        listen_count = (popularity or {}).get("total_listen_count") or 0
+        return self.base_score(candidate) * (1 + math.log10(1 + listen_count) / 10)
+
+    def top_candidates(self, count):
+        return heapq.nlargest(count, self.candidates.values(), key=self.base_score)
+
+    def rank(self, candidates, popularity_by_mbid, count):
+        return heapq.nlargest(count, candidates, key=lambda candidate: self.final_score(candidate, popularity_by_mbid.get(candidate["artist_mbid"])))
+
+    def __len__(self):
+        return len(self.candidates)
+
+class SearchJob:
+    def __init__(self, seed_mbids, force_refresh=False):
+        self.seed_mbids = seed_mbids
+        self.force_refresh = force_refresh
+        self.key = (hashlib.sha1("\n".join(sorted(seed_mbids)).encode()).hexdigest(), force_refresh)
+        self.room = f"search-{self.key[0]}-{id(self)}"
+        self.recommended_artists = []
+        self.recommended_artists_by_mbid = {}
+        self.subscribers = set()
+        self.lock = threading.RLock()
+        self.stop_event = threading.Event()
+        self.finished = False
+
+class SearchSession:
+    def __init__(self, sid, session_id=None):
+        self.sid = sid
+        self.session_id = session_id
+        self.detached = None
+        self.job = None
+        self.selected_mbids = set()
+        self.sidebar_filter = None
+        self.sidebar_version = None
+        self.sidebar_matches = []
+
+class RecurringTask:
+    def __init__(self, name, func, first_delay, interval, logger):
+        self.func = func
+        self.first_delay = first_delay
+        self.interval = interval
+        self.logger = logger
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        delay = self.first_delay
+        while not self.cancel_event.wait(delay):
+            try:
+                self.func()
+            except Exception as e:
+                self.logger.error(f"Scheduled Task Error: {type(e)} - {str(e)}")
+            if self.interval <= 0:
+                break
+            delay = self.interval
+
+    def cancel(self):
+        self.cancel_event.set()
+
+class ArtistAddQueue:
+    def __init__(self, queue_file, add_function, max_size, logger, drained_function=None):
+        self.queue_file = queue_file
+        self.add_function = add_function
+        self.drained_function = drained_function
+        self.max_size = max_size
+        self.logger = logger
+        self.pending = []
+        self.condition = threading.Condition()
+        self.load()
+        self.worker = threading.Thread(target=self.run, name="Add_Artists_Queue_Thread", daemon=True)
+
+    def start(self):
+        self.worker.start()
+
+    def load(self):
+        try:
+            if os.path.exists(self.queue_file):
+                with open(self.queue_file, "r") as json_file:
+                    self.pending = list(dict.fromkeys(json.load(json_file)))
+                if self.pending:
+                    self.logger.info(f"Resuming {len(self.pending)} queued artist adds")
+
+        except Exception as e:
+            self.logger.error(f"Error Loading Add Queue: {type(e)} - {str(e)}")
+
+    def save(self):
+        try:
+            write_json_file(self.queue_file, self.pending)
+
+        except Exception as e:
+            self.logger.error(f"Error Saving Add Queue: {type(e)} - {str(e)}")
+
+    def enqueue(self, mbids):
+        accepted = []
+        with self.condition:
+            for mbid in mbids:
+                if mbid in self.pending or len(self.pending) >= self.max_size:
+                    continue
+                self.pending.append(mbid)
+                accepted.append(mbid)
+            if accepted:
+                self.save()
+                self.condition.notify()
+        return accepted
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                mbid = self.pending[0]
+
+            try:
+                self.add_function(mbid)
+            except Exception as e:
+                self.logger.error(f"Add Queue Error: {type(e)} - {str(e)}")
+
+            with self.condition:
+                self.pending.remove(mbid)
+                self.save()
+                drained = not self.pending
+
+            if drained and self.drained_function:
+                self.drained_function()
+
+    def __len__(self):
+        return len(self.pending)
+
+class ArtistMetadataCache:
+    def __init__(self, db_path):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS artist_metadata (mbid TEXT PRIMARY KEY, name TEXT, source TEXT, updated_at REAL)")
+
+    def get_name(self, mbid):
+        with self.lock:
+            row = self.connection.execute("SELECT name FROM artist_metadata WHERE mbid = ?", (mbid,)).fetchone()
+        return row[0] if row else None
+
+    def set_names(self, names, source):
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO artist_metadata (mbid, name, source, updated_at) VALUES (?, ?, ?, ?)",
+                [(mbid, name, source, now) for mbid, name in names.items()],
+            )
+
+class ListenBrainzCache:
+    def __init__(self, db_path, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS similar_artists (seed_mbid TEXT, algorithm TEXT, data TEXT, fetched_at REAL, accessed_at REAL, PRIMARY KEY (seed_mbid, algorithm))")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS popularity (mbid TEXT PRIMARY KEY, data TEXT, fetched_at REAL, accessed_at REAL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS similar_artists_accessed ON similar_artists (accessed_at)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS popularity_accessed ON popularity (accessed_at)")
+
+    def _chunks(self, items, size=500):
+        for i in range(0, len(items), size):
+            yield items[i : i + size]
+
+    def _iter(self, table, key_column, keys, extra_where="", extra_args=(), size=500):
+        now = time.time()
+        for chunk in self._chunks(keys, size):
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock, self.connection:
+                rows = self.connection.execute(
+                    f"SELECT {key_column}, data FROM {table} WHERE {key_column} IN ({placeholders}) {extra_where} AND fetched_at >= ?",
+                    (*chunk, *extra_args, now - self.ttl_seconds),
+                ).fetchall()
+                self.connection.executemany(
+                    f"UPDATE {table} SET accessed_at = ? WHERE {key_column} = ? {extra_where}",
+                    [(now, key, *extra_args) for key, _ in rows],
+                )
+            found = {key: json.loads(data) for key, data in rows}
+            del rows
+            self.hits += len(found)
+            self.misses += len(chunk) - len(found)
+            metrics.increment("listenarr_listenbrainz_cache_hits_total", len(found), table=table)
+            metrics.increment("listenarr_listenbrainz_cache_misses_total", len(chunk) - len(found), table=table)
+            yield chunk, found
+
+    def _get(self, table, key_column, keys, extra_where="", extra_args=()):
+        found = {}
+        for _, chunk_found in self._iter(table, key_column, keys, extra_where, extra_args):
+            found.update(chunk_found)
+        return found
+
+    def _evict(self, table):
+        excess = self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.connection.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY accessed_at LIMIT ?)", (excess,))
+
+    def iter_similar_artists(self, seed_mbids, algorithm, missing_seeds, chunk_size=50):
+        # Yields the cached similar artists one chunk of seeds at a time and appends uncached seeds to missing_seeds.
+        for chunk, found in self._iter("similar_artists", "seed_mbid", seed_mbids, "AND algorithm = ?", (algorithm,), chunk_size):
+            missing_seeds.extend(seed_mbid for seed_mbid in chunk if seed_mbid not in found)
+            yield [artist for seed_mbid in chunk if seed_mbid in found for artist in found[seed_mbid]]
+
+    def set_similar_artists(self, seed_mbids, algorithm, similar_artists):
+        by_seed = {seed_mbid: [] for seed_mbid in seed_mbids}
+        for artist in similar_artists:
+            by_seed.setdefault(artist["reference_mbid"], []).append(artist)
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO similar_artists (seed_mbid, algorithm, data, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                [(seed_mbid, algorithm, json.dumps(artists), now, now) for seed_mbid, artists in by_seed.items()],
+            )
+            self._evict("similar_artists")
+
+    def get_popularity(self, mbids):
+        found = self._get("popularity", "mbid", mbids)
+        missing_mbids = [mbid for mbid in mbids if mbid not in found]
+        return found, missing_mbids
+
+    def set_popularity(self, popularity_data):
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO popularity (mbid, data, fetched_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(item["artist_mbid"], json.dumps(item), now, now) for item in popularity_data if item.get("artist_mbid")],
+            )
+            self._evict("popularity")
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM similar_artists")
+            self.connection.execute("DELETE FROM popularity")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            similar_artists_entries = self.connection.execute("SELECT COUNT(*) FROM similar_artists").fetchone()[0]
+            popularity_entries = self.connection.execute("SELECT COUNT(*) FROM popularity").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "similar_artists_entries": similar_artists_entries, "popularity_entries": popularity_entries}
 
 class DataHandler:
     def __init__(self):
@@ -23,25 +682,69 @@ class DataHandler:
         self.lidify_logger.warning(f"{APP_NAME} Version: {APP_VERSION}\n")
         self.lidify_logger.warning(f"{'*' * 50}")
 
-        self.search_in_progress_flag = False
         self.clients_connected_counter = 0
         self.config_folder = "config"
-        self.recommended_artists = []
-        self.lidarr_items = []
-        self.lidarr_mbids = []
-        self.stop_event = threading.Event()
-        self.stop_event.set()
+        self.sessions = {}
+        self.sessions_by_id = {}
+        self.running_jobs = {}
+        self.auto_start_job = None
+        self.jobs_lock = threading.RLock()
+        self.lidarr_artists = LidarrArtistIndex()
+        self.lidarr_snapshot_file = os.path.join(self.config_folder, "lidarr_artists.json")
         if not os.path.exists(self.config_folder):
             os.makedirs(self.config_folder)
+        self.services_lock = threading.RLock()
+        self.services_started = False
+        self.recommendations_file = os.path.join(self.config_folder, "recommendations.json")
+        self.auto_refresh_task = None
         self.load_environ_or_config_settings()
-        if self.auto_start:
+        self.load_lidarr_snapshot()
+        self.load_saved_recommendations()
+
+    def ensure_services(self):
+        if self.services_started:
+            return
+        with self.services_lock:
+            if self.services_started:
+                return
+            start = time.perf_counter()
             try:
-                auto_start_thread = threading.Timer(self.auto_start_delay, self.automated_startup)
-                auto_start_thread.daemon = True
-                auto_start_thread.start()
+                # Build everything before assigning any of it, so a failure leaves no half-started services behind.
+                http_client = HttpClient(self.http_pool_size, self.http_connect_timeout)
+                engine = ConcurrentEngine(self.listenbrainz_workers)
+                search_slots = threading.BoundedSemaphore(self.max_concurrent_searches)
+                listenbrainz_cache = ListenBrainzCache(os.path.join(self.config_folder, "listenbrainz_cache.db"), self.cache_ttl_hours * 3600, self.cache_max_entries)
+                artist_metadata_cache = ArtistMetadataCache(os.path.join(self.config_folder, "artist_metadata.db"))
+                import musicbrainzngs
+
+                musicbrainzngs.set_useragent(self.app_name, self.app_rev, "https://github.com/andrewtwelch/listenarr")
+                musicbrainzngs.set_rate_limit(limit_or_interval=1.0, new_requests=1)
+                add_queue = ArtistAddQueue(os.path.join(self.config_folder, "add_queue.json"), self.add_artists, self.add_queue_max_size, self.lidify_logger, self.save_lidarr_snapshot)
 
             except Exception as e:
-                self.lidify_logger.error(f"Auto Start Error: {type(e)} - {str(e)}")
+                self.lidify_logger.error(f"Error Starting Services: {type(e)} - {str(e)}")
+                raise
+
+            self.http_client = http_client
+            self.engine = engine
+            self.search_slots = search_slots
+            self.listenbrainz_cache = listenbrainz_cache
+            self.artist_metadata_cache = artist_metadata_cache
+            self.musicbrainz = musicbrainzngs
+            self.add_queue = add_queue
+            self.add_queue.start()
+            metrics.gauge("listenarr_clients_connected", "Connected Socket.IO clients", lambda: self.clients_connected_counter)
+            metrics.gauge("listenarr_add_queue_depth", "Artists waiting in the add queue", lambda: len(self.add_queue))
+            metrics.gauge("listenarr_running_searches", "Search jobs currently running", lambda: len(self.running_jobs))
+            metrics.gauge("listenarr_lidarr_artists", "Artists in the local Lidarr snapshot", lambda: len(self.lidarr_artists))
+            self.services_started = True
+            if self.auto_refresh_task is None:
+                self.schedule_auto_refresh(self.auto_start_delay)
+            try:
+                app.jinja_env.get_template("base.html")
+            except Exception as e:
+                self.lidify_logger.error(f"Error Loading Template: {type(e)} - {str(e)}")
+            self.lidify_logger.info(f"Services started in {time.perf_counter() - start:.3f}s")
 
     def load_environ_or_config_settings(self):
         # Defaults
@@ -56,6 +759,22 @@ class DataHandler:
             "dry_run_adding_to_lidarr": False,
             "auto_start": False,
             "auto_start_delay": 60,
+            "auto_refresh_interval_hours": 24,
+            "popularity_batch_size": 25,
+            "cache_ttl_hours": 168,
+            "cache_max_entries": 50000,
+            "similar_artists_chunk_size": 50,
+            "listenbrainz_workers": 4,
+            "listenbrainz_api_timeout": 30,
+            "listenbrainz_max_retries": 3,
+            "http_pool_size": 10,
+            "http_connect_timeout": 10,
+            "add_queue_max_size": 1000,
+            "max_concurrent_searches": 2,
+            "reconnect_grace_seconds": 60,
+            "emit_batch_size": 50,
+            "recommendation_limit": 100,
+            "ranking_max_candidates": 20000,
         }
 
         # Set blank values to allow getattr to work when loading from file
@@ -69,8 +788,25 @@ class DataHandler:
         self.dry_run_adding_to_lidarr = ""
         self.auto_start = ""
         self.auto_start_delay = ""
+        self.auto_refresh_interval_hours = ""
+        self.popularity_batch_size = ""
+        self.cache_ttl_hours = ""
+        self.cache_max_entries = ""
+        self.similar_artists_chunk_size = ""
+        self.listenbrainz_workers = ""
+        self.listenbrainz_api_timeout = ""
+        self.listenbrainz_max_retries = ""
+        self.http_pool_size = ""
+        self.http_connect_timeout = ""
+        self.add_queue_max_size = ""
+        self.max_concurrent_searches = ""
+        self.reconnect_grace_seconds = ""
+        self.emit_batch_size = ""
+        self.recommendation_limit = ""
+        self.ranking_max_candidates = ""
 
         # Load variables from the configuration file if it exists
+        ret = {}
         try:
             self.settings_config_file = os.path.join(self.config_folder, "settings_config.json")
             if os.path.exists(self.settings_config_file):
@@ -78,7 +814,7 @@ class DataHandler:
                 with open(self.settings_config_file, "r") as json_file:
                     ret = json.load(json_file)
                     for key in ret:
-                        if getattr(self, key) == "":
+                        if getattr(self, key, None) == "":
                             setattr(self, key, ret[key])
 
         except Exception as e:
@@ -92,6 +828,22 @@ class DataHandler:
         # Ensure integer based settings are converted to integers, then enforce min/max
         self.lidarr_api_timeout = int(self.lidarr_api_timeout)
         self.auto_start_delay = int(self.auto_start_delay)
+        self.auto_refresh_interval_hours = int(self.auto_refresh_interval_hours)
+        self.popularity_batch_size = int(self.popularity_batch_size)
+        self.cache_ttl_hours = int(self.cache_ttl_hours)
+        self.cache_max_entries = int(self.cache_max_entries)
+        self.similar_artists_chunk_size = int(self.similar_artists_chunk_size)
+        self.listenbrainz_workers = int(self.listenbrainz_workers)
+        self.listenbrainz_api_timeout = int(self.listenbrainz_api_timeout)
+        self.listenbrainz_max_retries = int(self.listenbrainz_max_retries)
+        self.http_pool_size = int(self.http_pool_size)
+        self.http_connect_timeout = int(self.http_connect_timeout)
+        self.add_queue_max_size = int(self.add_queue_max_size)
+        self.max_concurrent_searches = int(self.max_concurrent_searches)
+        self.reconnect_grace_seconds = int(self.reconnect_grace_seconds)
+        self.emit_batch_size = int(self.emit_batch_size)
+        self.recommendation_limit = int(self.recommendation_limit)
+        self.ranking_max_candidates = int(self.ranking_max_candidates)
         if self.lidarr_api_timeout < 10:
             self.lidarr_api_timeout = 10
         elif self.lidarr_api_timeout > 300:
@@ -100,147 +852,582 @@ class DataHandler:
             self.auto_start_delay = 10
         elif self.auto_start_delay > 120:
             self.auto_start_delay = 120
+        if self.auto_refresh_interval_hours < 0:
+            self.auto_refresh_interval_hours = 0
+        elif self.auto_refresh_interval_hours > 168:
+            self.auto_refresh_interval_hours = 168
+        if self.popularity_batch_size < 1:
+            self.popularity_batch_size = 1
+        elif self.popularity_batch_size > 100:
+            self.popularity_batch_size = 100
+        if self.cache_ttl_hours < 1:
+            self.cache_ttl_hours = 1
+        elif self.cache_ttl_hours > 8760:
+            self.cache_ttl_hours = 8760
+        if self.cache_max_entries < 1000:
+            self.cache_max_entries = 1000
+        if self.similar_artists_chunk_size < 1:
+            self.similar_artists_chunk_size = 1
+        elif self.similar_artists_chunk_size > 500:
+            self.similar_artists_chunk_size = 500
+        if self.listenbrainz_workers < 1:
+            self.listenbrainz_workers = 1
+        elif self.listenbrainz_workers > 200:
+            self.listenbrainz_workers = 200
+        if self.listenbrainz_api_timeout < 5:
+            self.listenbrainz_api_timeout = 5
+        elif self.listenbrainz_api_timeout > 300:
+            self.listenbrainz_api_timeout = 300
+        if self.listenbrainz_max_retries < 0:
+            self.listenbrainz_max_retries = 0
+        elif self.listenbrainz_max_retries > 10:
+            self.listenbrainz_max_retries = 10
+        if self.http_pool_size < 1:
+            self.http_pool_size = 1
+        elif self.http_pool_size > 100:
+            self.http_pool_size = 100
+        if self.http_connect_timeout < 1:
+            self.http_connect_timeout = 1
+        elif self.http_connect_timeout > 60:
+            self.http_connect_timeout = 60
+        if self.add_queue_max_size < 1:
+            self.add_queue_max_size = 1
+        if self.max_concurrent_searches < 1:
+            self.max_concurrent_searches = 1
+        elif self.max_concurrent_searches > 20:
+            self.max_concurrent_searches = 20
+        if self.reconnect_grace_seconds < 0:
+            self.reconnect_grace_seconds = 0
+        elif self.reconnect_grace_seconds > 600:
+            self.reconnect_grace_seconds = 600
+        if self.emit_batch_size < 1:
+            self.emit_batch_size = 1
+        elif self.emit_batch_size > 500:
+            self.emit_batch_size = 500
+        if self.recommendation_limit < 1:
+            self.recommendation_limit = 1
+        elif self.recommendation_limit > 1000:
+            self.recommendation_limit = 1000
+        if self.ranking_max_candidates < 1000:
+            self.ranking_max_candidates = 1000
+        elif self.ranking_max_candidates > 500000:
+            self.ranking_max_candidates = 500000
+
+        # Save config only when the file is missing or out of date.
+        if ret != self.config_settings():
+            self.save_config_to_file()
 
-        # Save config.
-        self.save_config_to_file()
+    def schedule_auto_refresh(self, first_delay):
+        if self.auto_refresh_task:
+            self.auto_refresh_task.cancel()
+            self.auto_refresh_task = None
+        if self.auto_start and (first_delay > 0 or self.auto_refresh_interval_hours > 0):
+            first_delay = first_delay if first_delay > 0 else self.auto_refresh_interval_hours * 3600
+            self.auto_refresh_task = RecurringTask("Auto_Refresh_Thread", self.automated_startup, first_delay, self.auto_refresh_interval_hours * 3600, self.lidify_logger)
+            self.lidify_logger.info(f"Auto refresh scheduled in {first_delay}s, then every {self.auto_refresh_interval_hours}h")
+
+    def load_saved_recommendations(self):
+        try:
+            if os.path.exists(self.recommendations_file):
+                with open(self.recommendations_file, "r") as json_file:
+                    saved = json.load(json_file)
+                job = SearchJob(saved["seed_mbids"])
+                job.recommended_artists = [artist for artist in saved["recommended_artists"] if artist["Mbid"] not in self.lidarr_artists]
+                job.recommended_artists_by_mbid = {artist["Mbid"]: artist for artist in job.recommended_artists}
+                job.finished = True
+                job.stop_event.set()
+                self.auto_start_job = job
+                self.lidify_logger.info(f"Loaded {len(job.recommended_artists)} saved recommendations from {time.ctime(saved["updated_at"])}")
+
+        except Exception as e:
+            self.lidify_logger.error(f"Error Loading Saved Recommendations: {type(e)} - {str(e)}")
+
+    def save_recommendations(self, job):
+        try:
+            with job.lock:
+                saved = {"seed_mbids": job.seed_mbids, "recommended_artists": job.recommended_artists, "updated_at": time.time()}
+            write_json_file(self.recommendations_file, saved)
+
+        except Exception as e:
+            self.lidify_logger.error(f"Error Saving Recommendations: {type(e)} - {str(e)}")
 
     def automated_startup(self):
-        self.get_artists_from_lidarr(checked=True)
-        artists = [x["mbid"] for x in self.lidarr_items]
-        self.start(artists)
+        self.ensure_services()
+        self.get_artists_from_lidarr()
+        artists = self.lidarr_artists.mbids()
+        if not artists:
+            self.lidify_logger.error("Auto Start Error: No Lidarr Artists Found")
+            return
+        # Build the refresh without subscribers so viewers keep the previous results until it succeeds.
+        job = SearchJob(artists)
+        self.run_job(job)
+        if not job.recommended_artists:
+            self.lidify_logger.error("Auto Refresh Error: No recommendations found, keeping the previous results")
+            return
+        self.save_recommendations(job)
+        with self.jobs_lock:
+            previous_job = self.auto_start_job
+            self.auto_start_job = job
+            for session in list(self.sessions.values()):
+                if session.job is None or session.job is previous_job:
+                    self.unsubscribe(session)
+                    socketio.emit("clear", to=session.sid)
+                    session.selected_mbids = set(artists)
+                    self.subscribe(session, job)
+
+    def connection(self, sid, session_id=None):
+        with self.jobs_lock:
+            session = self.sessions_by_id.get(session_id) if session_id else None
+            if session and session.detached:
+                # A reconnecting client takes its session and search back under the new sid.
+                session.detached = None
+                job = session.job
+                if job:
+                    with job.lock:
+                        job.subscribers.discard(session.sid)
+                session.sid = sid
+                self.sessions[sid] = session
+                self.clients_connected_counter = len(self.sessions)
+                if job:
+                    self.subscribe(session, job)
+                elif self.auto_start_job:
+                    self.subscribe(session, self.auto_start_job)
+                return
+
+            if session:
+                # Another connection (such as a duplicated tab) already owns this id.
+                session_id = None
+            session = SearchSession(sid, session_id)
+            if session_id:
+                self.sessions_by_id[session_id] = session
+            self.sessions[sid] = session
+            self.clients_connected_counter = len(self.sessions)
+            if self.auto_start_job:
+                session.selected_mbids = set(self.auto_start_job.seed_mbids)
+                self.subscribe(session, self.auto_start_job)
+
+    def disconnection(self, sid):
+        with self.jobs_lock:
+            session = self.sessions.pop(sid, None)
+            self.clients_connected_counter = len(self.sessions)
+            if session is None:
+                return
+            if session.session_id and self.reconnect_grace_seconds > 0:
+                # Keep the session and its job subscribed for a while so a reconnect can pick it back up.
+                session.detached = object()
+                expiry = threading.Timer(self.reconnect_grace_seconds, self.expire_session, args=(session, session.detached))
+                expiry.daemon = True
+                expiry.start()
+            else:
+                self.sessions_by_id.pop(session.session_id, None)
+                self.unsubscribe(session)
+
+    def expire_session(self, session, detached):
+        with self.jobs_lock:
+            if session.detached is not detached:
+                return
+            self.sessions_by_id.pop(session.session_id, None)
+            self.unsubscribe(session)
+
+    def subscribe(self, session, job):
+        with job.lock:
+            session.job = job
+            job.subscribers.add(session.sid)
+            socketio.server.enter_room(session.sid, job.room, namespace="/")
+            if job.recommended_artists:
+                socketio.emit("more_artists_loaded", job.recommended_artists, to=session.sid)
+            if job.finished:
+                socketio.emit("finished_finding", to=session.sid)
+
+    def unsubscribe(self, session):
+        job = session.job
+        if job is None:
+            return
+        with job.lock:
+            job.subscribers.discard(session.sid)
+            socketio.server.leave_room(session.sid, job.room, namespace="/")
+            if not job.subscribers and job is not self.auto_start_job:
+                job.stop_event.set()
+
+    def is_running(self, session):
+        return session is not None and session.job is not None and session.sid in session.job.subscribers and not session.job.finished
 
-    def connection(self):
-        if self.recommended_artists:
-            socketio.emit("more_artists_loaded", self.recommended_artists)
-        self.clients_connected_counter += 1
+    def sidebar_summary(self, session):
+        return {"Total": len(self.lidarr_artists), "Selected": len(session.selected_mbids & self.lidarr_artists.by_mbid.keys()) if session else 0}
 
-    def disconnection(self):
-        self.clients_connected_counter = max(0, self.clients_connected_counter - 1)
+    def sidebar_matches(self, session, filter_text):
+        filter_text = filter_text.strip().lower()
+        with self.lidarr_artists.lock:
+            if session.sidebar_filter != filter_text or session.sidebar_version != self.lidarr_artists.version:
+                session.sidebar_matches = self.lidarr_artists.filter(filter_text)
+                session.sidebar_filter = filter_text
+                session.sidebar_version = self.lidarr_artists.version
+            return session.sidebar_matches
 
-    def start(self, data):
+    def all_selected(self, session, matches):
+        return bool(matches) and all(item["mbid"] in session.selected_mbids for item in matches)
+
+    def sidebar_page(self, sid, data):
+        session = self.sessions.get(sid)
+        if session is None:
+            return
         try:
-            socketio.emit("clear")
-            self.artists_to_use_in_search = []
-            self.recommended_artists = []
-
-            for item in self.lidarr_items:
-                item_mbid = item["mbid"]
-                if item_mbid in data:
-                    item["checked"] = True
-                    self.artists_to_use_in_search.append(item["mbid"])
-                else:
-                    item["checked"] = False
+            filter_text = str(data.get("filter", ""))
+            offset = max(0, int(data.get("offset", 0)))
+            limit = min(max(1, int(data.get("limit", 100))), 500)
+            matches = self.sidebar_matches(session, filter_text)
+            items = [{"name": item["name"], "mbid": item["mbid"], "checked": item["mbid"] in session.selected_mbids} for item in matches[offset : offset + limit]]
+            ret = {"Filter": filter_text, "Offset": offset, "Total": len(matches), "Items": items, "All_Selected": self.all_selected(session, matches)}
+            socketio.emit("lidarr_page_loaded", ret, to=sid)
+
+        except Exception as e:
+            self.lidify_logger.error(f"Sidebar Page Error: {type(e)} - {str(e)}")
 
-            if self.artists_to_use_in_search:
-                self.stop_event.clear()
+    def select_artists(self, sid, data):
+        session = self.sessions.get(sid)
+        if session is None or self.is_running(session):
+            return
+        try:
+            filter_text = str(data.get("filter", ""))
+            if data.get("all"):
+                mbids = [item["mbid"] for item in self.sidebar_matches(session, filter_text)]
+            else:
+                mbids = [data["mbid"]]
+            if data["checked"]:
+                session.selected_mbids.update(mbid for mbid in mbids if mbid in self.lidarr_artists)
             else:
-                self.stop_event.set()
-                raise Exception("No Lidarr Artists Selected")
+                session.selected_mbids.difference_update(mbids)
+            ret = {"Filter": filter_text, **self.sidebar_summary(session), "All_Selected": self.all_selected(session, self.sidebar_matches(session, filter_text))}
+            socketio.emit("lidarr_selection", ret, to=sid)
+
+        except Exception as e:
+            self.lidify_logger.error(f"Select Artists Error: {type(e)} - {str(e)}")
+
+    def active_jobs(self):
+        with self.jobs_lock:
+            jobs = {id(job): job for job in self.running_jobs.values()}
+            jobs.update({id(session.job): session.job for session in self.sessions.values() if session.job})
+            if self.auto_start_job:
+                jobs[id(self.auto_start_job)] = self.auto_start_job
+        return list(jobs.values())
+
+    def side_bar_opened(self, sid):
+        session = self.sessions.get(sid)
+        if self.lidarr_artists:
+            ret = {"Status": "Success", **self.sidebar_summary(session), "Running": self.is_running(session)}
+            socketio.emit("lidarr_sidebar_update", ret, to=sid)
+
+    def start(self, sid, data, force_refresh=False):
+        session = self.sessions.get(sid)
+        try:
+            self.ensure_services()
+            if session is None:
+                raise Exception("Unknown Session")
+            socketio.emit("clear", to=sid)
+            if isinstance(data, dict):
+                force_refresh = bool(data.get("force_refresh"))
+                data = data.get("mbids")
+            selected_mbids = set(data) if data is not None else session.selected_mbids
+            artists_to_use_in_search = [item["mbid"] for item in self.lidarr_artists.items if item["mbid"] in selected_mbids]
+            session.selected_mbids = set(artists_to_use_in_search)
+
+            with self.jobs_lock:
+                self.unsubscribe(session)
+                session.job = None
+                if not artists_to_use_in_search:
+                    raise Exception("No Lidarr Artists Selected")
+
+                job = SearchJob(artists_to_use_in_search, force_refresh)
+                shared_job = self.running_jobs.get(job.key)
+                if shared_job and not shared_job.stop_event.is_set():
+                    job = shared_job
+                    socketio.emit("new_toast_msg", {"title": "Joined Search", "message": "Sharing results with a search already running for the same artists."}, to=sid)
+                else:
+                    self.running_jobs[job.key] = job
+                    shared_job = None
+                self.subscribe(session, job)
 
         except Exception as e:
             self.lidify_logger.error(f"Startup Error: {type(e)} - {str(e)}")
-            self.stop_event.set()
-            ret = {"Status": "Error", "Code": str(e), "Data": self.lidarr_items, "Running": not self.stop_event.is_set()}
-            socketio.emit("lidarr_sidebar_update", ret)
+            ret = {"Status": "Error", "Code": str(e), **self.sidebar_summary(session), "Running": False}
+            socketio.emit("lidarr_sidebar_update", ret, to=sid)
 
         else:
-            self.find_similar_artists()
+            if shared_job is None:
+                self.run_job(job)
+
+    def stop(self, sid):
+        session = self.sessions.get(sid)
+        if session:
+            with self.jobs_lock:
+                self.unsubscribe(session)
+        socketio.emit("finished_finding", to=sid)
+
+    def run_job(self, job):
+        try:
+            if not self.search_slots.acquire(blocking=False):
+                socketio.emit("new_toast_msg", {"title": "Search Queued", "message": "Waiting for another search to finish."}, to=job.room)
+                self.search_slots.acquire()
+            try:
+                self.find_similar_artists(job)
+            finally:
+                self.search_slots.release()
+
+        finally:
+            with self.jobs_lock:
+                if self.running_jobs.get(job.key) is job:
+                    del self.running_jobs[job.key]
+            with job.lock:
+                job.finished = True
+                job.stop_event.set()
+            socketio.emit("finished_finding", to=job.room)
 
-    def get_artists_from_lidarr(self, checked=False):
+    def load_lidarr_snapshot(self):
         try:
+            if os.path.exists(self.lidarr_snapshot_file):
+                self.lidarr_artists.load_snapshot(self.lidarr_snapshot_file)
+                self.lidify_logger.info(f"Loaded {len(self.lidarr_artists)} Lidarr artists from snapshot")
+
+        except Exception as e:
+            self.lidify_logger.error(f"Error Loading Lidarr Snapshot: {type(e)} - {str(e)}")
+
+    def save_lidarr_snapshot(self):
+        try:
+            self.lidarr_artists.save_snapshot(self.lidarr_snapshot_file)
+
+        except Exception as e:
+            self.lidify_logger.error(f"Error Saving Lidarr Snapshot: {type(e)} - {str(e)}")
+
+    @metrics.timed("listenarr_stage_seconds", stage="Get Lidarr artists")
+    def get_artists_from_lidarr(self, sid=None):
+        try:
+            self.ensure_services()
             self.lidify_logger.info(f"Getting Artists from Lidarr")
-            self.lidarr_items = []
-            self.lidarr_mbids = []
             endpoint = f"{self.lidarr_address}/api/v1/artist"
             headers = {"X-Api-Key": self.lidarr_api_key}
-            response = requests.get(endpoint, headers=headers, timeout=self.lidarr_api_timeout)
-
-            if response.status_code == 200:
-                self.full_lidarr_artist_list = response.json()
-                self.lidarr_items = [{"name": artist["artistName"], "mbid": artist["foreignArtistId"], "checked": checked} for artist in self.full_lidarr_artist_list]
-                self.lidarr_mbids = [artist["foreignArtistId"] for artist in self.full_lidarr_artist_list]
-                self.lidarr_items.sort(key=lambda x: x["name"].lower())
-                status = "Success"
-                data = self.lidarr_items
-            else:
-                status = "Error"
-                data = response.text
+            with self.http_client.get(endpoint, headers=headers, timeout=self.lidarr_api_timeout, stream=True) as response:
+                if response.status_code == 200:
+                    lidarr_artists = {artist["foreignArtistId"]: artist["artistName"] for artist in self.http_client.iter_json_array(response)}
+                    added, removed, renamed = self.lidarr_artists.sync(lidarr_artists)
+                    del lidarr_artists
+                    self.lidify_logger.info(f"Lidarr sync: {added} added, {removed} removed, {renamed} renamed")
+                    if added or removed or renamed:
+                        self.save_lidarr_snapshot()
+                    status = "Success"
+                    data = None
+                else:
+                    status = "Error"
+                    data = response.text
 
-            ret = {"Status": status, "Code": response.status_code if status == "Error" else None, "Data": data, "Running": not self.stop_event.is_set()}
+            ret = {"Status": status, "Code": response.status_code if status == "Error" else None, "Data": data}
 
         except Exception as e:
             self.lidify_logger.error(f"Getting Artist Error: {type(e)} - {str(e)}")
-            ret = {"Status": "Error", "Code": 500, "Data": str(e), "Running": not self.stop_event.is_set()}
+            ret = {"Status": "Error", "Code": 500, "Data": str(e)}
 
         finally:
-            socketio.emit("lidarr_sidebar_update", ret)
+            metrics.increment("listenarr_lidarr_syncs_total", status=ret["Status"])
+            sessions = [self.sessions[sid]] if sid in self.sessions else list(self.sessions.values())
+            for session in sessions:
+                session_ret = {**ret, "Running": self.is_running(session)}
+                if session_ret["Status"] == "Success":
+                    session_ret.update(self.sidebar_summary(session))
+                socketio.emit("lidarr_sidebar_update", session_ret, to=session.sid)
 
-    def filter_similar_artist_response(self, suggested_artist):
-        return suggested_artist["artist_mbid"] not in self.lidarr_mbids
+    def post_to_listenbrainz(self, url, payload, stop_event):
+        # Only connection problems, rate limiting and server errors are retried; other 4xx and bad JSON raise at once.
+        for attempt in range(self.listenbrainz_max_retries + 1):
+            try:
+                response = self.http_client.post(url, json=payload, timeout=self.listenbrainz_api_timeout)
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = Exception(f"ListenBrainz returned status {response.status_code}")
 
-    def find_similar_artists(self):
-        if self.stop_event.is_set() or self.search_in_progress_flag:
-            return
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt >= self.listenbrainz_max_retries or stop_event.is_set():
+                raise error
+            backoff = 2**attempt
+            self.lidify_logger.warning(f"ListenBrainz request failed, retrying in {backoff}s: {type(error)} - {str(error)}")
+            if stop_event.wait(backoff):
+                raise Exception("Search stopped while waiting to retry ListenBrainz")
+
+    @metrics.timed("listenarr_stage_seconds", stage="ListenBrainz similar-artists chunk")
+    def query_similar_artists_chunk(self, job, seed_mbids, algorithm):
+        payload = [
+            {
+                "artist_mbids": seed_mbids,
+                "algorithm": algorithm
+            }
+        ]
+        similar_artists = self.post_to_listenbrainz(LISTENBRAINZ_SIMILAR_ARTISTS_URL, payload, job.stop_event)
+        self.listenbrainz_cache.set_similar_artists(seed_mbids, algorithm, similar_artists)
+        return similar_artists
+
+    @metrics.timed("listenarr_stage_seconds", stage="ListenBrainz popularity batch")
+    def lookup_popularity(self, job, mbids):
+        if job.force_refresh:
+            popularity_by_mbid, mbids_to_query = {}, mbids
         else:
-            try:
-                self.lidify_logger.info("Searching for new artists via ListenBrainz similar-artists")
-                self.search_in_progress_flag = True
-                payload = [
-                    {
-                        "artist_mbids": self.artists_to_use_in_search,
-                        "algorithm": f"session_based_days_7500_session_300_contribution_5_threshold_10_limit_100_filter_True_skip_30"
-                    }
-                ]
-                similar_artists = requests.post("https://labs.api.listenbrainz.org/similar-artists/json", json=payload).json()
-                if len(similar_artists) == 0:
-                    socketio.emit("new_toast_msg", {"title": "No similar artists", "message": f"No similar artists found."})
-                    raise Exception("No similar artists returned")
-                filtered_similar_artists = filter(lambda x: x["artist_mbid"] not in self.lidarr_mbids, similar_artists)
-
-                for artist in filtered_similar_artists:
-                    if self.stop_event.is_set():
+            popularity_by_mbid, mbids_to_query = self.listenbrainz_cache.get_popularity(mbids)
+
+        if mbids_to_query:
+            payload = {
+                "artist_mbids": mbids_to_query
+            }
+            popularity_data = self.post_to_listenbrainz(LISTENBRAINZ_POPULARITY_URL, payload, job.stop_event)
+            self.listenbrainz_cache.set_popularity(popularity_data)
+            popularity_by_mbid.update({item["artist_mbid"]: item for item in popularity_data if item.get("artist_mbid")})
+        return popularity_by_mbid
+
+    def build_returned_artist(self, candidate, popularity):
+        returned_artist = {
+            "Name": candidate["name"],
+            "Mbid": candidate["artist_mbid"],
+            "Status": "",
+            "Similar_To": ""
+        }
+        similar_to = []
+        for _, reference_mbid in candidate["references"]:
+            lidarr_artist = self.lidarr_artists.get(reference_mbid)
+            if lidarr_artist and lidarr_artist["name"] not in similar_to:
+                similar_to.append(lidarr_artist["name"])
+        if candidate["seed_count"] > 2 and len(similar_to) >= 2:
+            returned_artist["Similar_To"] = f"Similar to {similar_to[0]}, {similar_to[1]} and {candidate["seed_count"] - 2} more"
+        elif similar_to:
+            returned_artist["Similar_To"] = f"Similar to {" and ".join(similar_to[:2])}"
+
+        returned_artist["Popularity"] = f"{self.format_numbers(popularity["total_listen_count"])} listens"
+        returned_artist["Followers"] = f"{self.format_numbers(popularity["total_user_count"])} users"
+        return returned_artist
+
+    def emit_recommendations(self, job, artists):
+        with job.lock:
+            if job.stop_event.is_set():
+                return
+            job.recommended_artists.extend(artists)
+            job.recommended_artists_by_mbid.update({artist["Mbid"]: artist for artist in artists})
+            for i in range(0, len(artists), self.emit_batch_size):
+                socketio.emit("more_artists_loaded", artists[i : i + self.emit_batch_size], to=job.room)
+
+    @metrics.timed("listenarr_stage_seconds", stage="Find similar artists")
+    def find_similar_artists(self, job):
+        if job.stop_event.is_set():
+            return
+        stage = "ListenBrainz similar-artists lookup"
+        status = "Error"
+        try:
+            self.lidify_logger.info("Searching for new artists via ListenBrainz similar-artists")
+            algorithm = LISTENBRAINZ_SIMILAR_ARTISTS_ALGORITHM
+            with metrics.time("listenarr_stage_seconds", stage=stage):
+                ranker = RecommendationRanker(self.lidarr_artists, self.ranking_max_candidates)
+                similar_artists_found = 0
+                if job.force_refresh:
+                    seeds_to_query = job.seed_mbids
+                else:
+                    seeds_to_query = []
+                    for cached_similar_artists in self.listenbrainz_cache.iter_similar_artists(job.seed_mbids, algorithm, seeds_to_query, self.similar_artists_chunk_size):
+                        similar_artists_found += len(cached_similar_artists)
+                        ranker.add(cached_similar_artists)
+
+                if seeds_to_query and not job.stop_event.is_set():
+                    chunks = [seeds_to_query[i : i + self.similar_artists_chunk_size] for i in range(0, len(seeds_to_query), self.similar_artists_chunk_size)]
+                    query_chunk = lambda chunk: self.query_similar_artists_chunk(job, chunk, algorithm)
+                    for chunk, chunk_similar_artists, error in self.engine.imap_unordered(query_chunk, chunks, job.stop_event):
+                        if error:
+                            self.lidify_logger.error(f"ListenBrainz similar-artists chunk of {len(chunk)} seeds failed: {type(error)} - {str(error)}")
+                        else:
+                            similar_artists_found += len(chunk_similar_artists)
+                            ranker.add(chunk_similar_artists)
+
+            if similar_artists_found == 0 and not job.stop_event.is_set():
+                socketio.emit("new_toast_msg", {"title": "No similar artists", "message": f"No similar artists found."}, to=job.room)
+                raise Exception("No similar artists returned")
+
+            stage = "ListenBrainz artist popularity lookup"
+            with metrics.time("listenarr_stage_seconds", stage=stage):
+                candidates = ranker.top_candidates(self.recommendation_limit * 2)
+                batches = [[candidate["artist_mbid"] for candidate in candidates[i : i + self.popularity_batch_size]] for i in range(0, len(candidates), self.popularity_batch_size)]
+                popularity_by_mbid = {}
+                for batch, batch_popularity, error in self.engine.imap_unordered(lambda batch: self.lookup_popularity(job, batch), batches, job.stop_event):
+                    if error:
+                        self.lidify_logger.error(f"{stage} error: {type(error)} - {str(error)}")
+                    else:
+                        popularity_by_mbid.update(batch_popularity)
+
+            stage = "Rank recommendations"
+            with metrics.time("listenarr_stage_seconds", stage=stage):
+                returned_artists = []
+                for candidate in ranker.rank(candidates, popularity_by_mbid, self.recommendation_limit):
+                    if job.stop_event.is_set():
                         break
                     try:
-                        payload = {
-                            "artist_mbids": [artist["artist_mbid"]]
-                        }
-                        returned_artist = {
-                            "Name": artist["name"],
-                            "Mbid": artist["artist_mbid"],
-                            "Status": "",
-                            "Similar_To": ""
-                        }
-                        for lidarr_artist in self.lidarr_items:
-                            if lidarr_artist["mbid"] == artist["reference_mbid"]:
-                                returned_artist["Similar_To"] = f"Similar to {lidarr_artist["name"]}"
-                                break
-
-                        stage = "ListenBrainz artist popularity lookup"
-                        popularity_data = requests.post("https://api.listenbrainz.org/1/popularity/artist", json=payload).json()
-                        returned_artist["Popularity"] = f"{self.format_numbers(popularity_data[0]["total_listen_count"])} listens"
-                        returned_artist["Followers"] = f"{self.format_numbers(popularity_data[0]["total_user_count"])} users"
-
-                        stage = "Send to client"
-                        self.recommended_artists.append(returned_artist)
-                        socketio.emit("more_artists_loaded", [returned_artist])
-
+                        returned_artists.append(self.build_returned_artist(candidate, popularity_by_mbid[candidate["artist_mbid"]]))
                     except Exception as e:
-                        self.lidify_logger.error(f"{stage} error: {type(e)} - {str(e)}")
+                        self.lidify_logger.error(f"Build artist details error: {type(e)} - {str(e)}")
 
-            except Exception as e:
-                self.lidify_logger.error(f"ListenBrainz similar-artists lookup error: {type(e)} - {str(e)}")
+            self.lidify_logger.info(f"Ranked {len(ranker)} candidates from {len(job.seed_mbids)} seeds, returning {len(returned_artists)}")
+            if returned_artists:
+                self.artist_metadata_cache.set_names({artist["Mbid"]: artist["Name"] for artist in returned_artists}, "listenbrainz")
+                self.emit_recommendations(job, returned_artists)
+            status = "Stopped" if job.stop_event.is_set() else "Success"
 
-            finally:
-                self.stop_event.set()
-                self.search_in_progress_flag = False
-                socketio.emit("finished_finding")
+        except Exception as e:
+            self.lidify_logger.error(f"{stage} error: {type(e)} - {str(e)}")
+
+        finally:
+            metrics.increment("listenarr_searches_total", status=status)
+            self.lidify_logger.info(f"HTTP client stats: {self.http_client.stats()}")
+
+    def update_recommended_artist_status(self, mbid, status):
+        for job in self.active_jobs():
+            item = job.recommended_artists_by_mbid.get(mbid)
+            if item:
+                item["Status"] = status
+        for session in list(self.sessions.values()):
+            item = session.job.recommended_artists_by_mbid.get(mbid) if session.job else None
+            if item:
+                socketio.emit("refresh_artist", item, to=session.sid)
+
+    def queue_artists(self, sid, mbids):
+        try:
+            self.ensure_services()
+            if isinstance(mbids, str):
+                mbids = [mbids]
+            queued = self.add_queue.enqueue(mbids)
+            for mbid in queued:
+                self.update_recommended_artist_status(mbid, "Queued")
+            if len(queued) < len(mbids):
+                socketio.emit("new_toast_msg", {"title": "Add Queue", "message": f"Queued {len(queued)} of {len(mbids)} artists, the rest are already queued or the queue is full."}, to=sid)
+            elif len(queued) > 1:
+                socketio.emit("new_toast_msg", {"title": "Add Queue", "message": f"Queued {len(queued)} artists to add to Lidarr."}, to=sid)
+
+        except Exception as e:
+            self.lidify_logger.error(f"Queueing Artists Error: {type(e)} - {str(e)}")
+
+    def get_artist_name(self, mbid):
+        for job in self.active_jobs():
+            recommended_artist = job.recommended_artists_by_mbid.get(mbid)
+            if recommended_artist:
+                return recommended_artist["Name"]
+
+        artist_name = self.artist_metadata_cache.get_name(mbid)
+        if artist_name:
+            return artist_name
+
+        with metrics.time("listenarr_upstream_request_seconds", host="musicbrainz.org", method="GET"):
+            artist_lookup = self.musicbrainz.get_artist_by_id(mbid)
+        artist_name = artist_lookup["artist"]["name"]
+        self.artist_metadata_cache.set_names({mbid: artist_name}, "musicbrainz")
+        return artist_name
 
+    @metrics.timed("listenarr_stage_seconds", stage="Add artist to Lidarr")
     def add_artists(self, mbid):
         try:
-            musicbrainzngs.set_useragent(self.app_name, self.app_rev, "https://github.com/andrewtwelch/listenarr")
-            artist_lookup = musicbrainzngs.get_artist_by_id(mbid)
-            artist_details = artist_lookup["artist"]
-            artist_name = artist_details["name"]
+            self.update_recommended_artist_status(mbid, "Adding")
+            artist_name = self.get_artist_name(mbid)
             artist_folder = artist_name.replace("/", " ")
 
             lidarr_url = f"{self.lidarr_address}/api/v1/artist"
@@ -258,14 +1445,12 @@ class DataHandler:
                 response = requests.Response()
                 response.status_code = 201
             else:
-                response = requests.post(lidarr_url, headers=headers, json=payload, timeout=self.lidarr_api_timeout)
+                response = self.http_client.post(lidarr_url, headers=headers, json=payload, timeout=self.lidarr_api_timeout)
 
             if response.status_code == 201:
                 self.lidify_logger.info(f"Artist '{artist_name}' added successfully to Lidarr.")
                 status = "Added"
-                self.lidarr_items.append({"name": artist_name, "mbid": mbid, "checked": False})
-                self.lidarr_items.sort(key=lambda x: x["name"].lower())
-                self.lidarr_mbids.append(mbid)
+                self.lidarr_artists.add(artist_name, mbid)
             else:
                 self.lidify_logger.error(f"Failed to add artist '{artist_name}' to Lidarr.")
                 error_data = json.loads(response.content)
@@ -283,27 +1468,27 @@ class DataHandler:
                 else:
                     status = "Failed to Add"
 
-            for item in self.recommended_artists:
-                if item["Name"] == artist_name:
-                    item["Status"] = status
-                    socketio.emit("refresh_artist", item)
-                    break
+            metrics.increment("listenarr_artist_adds_total", status=status)
+            self.update_recommended_artist_status(mbid, status)
 
         except Exception as e:
             self.lidify_logger.error(f"Adding Artist Error: {type(e)} - {str(e)}")
+            metrics.increment("listenarr_artist_adds_total", status="Failed to Add")
+            self.update_recommended_artist_status(mbid, "Failed to Add")
 
-    def load_settings(self):
+    def load_settings(self, sid):
         try:
+            self.ensure_services()
             headers = {"X-Api-Key": self.lidarr_api_key}
             metadata_profiles = []
             quality_profiles = []
             root_folders = []
             if self.lidarr_address:
-                status_request = requests.get(f"{self.lidarr_address}/api/v1/system/status", headers=headers, timeout=10)
+                status_request = self.http_client.get(f"{self.lidarr_address}/api/v1/system/status", headers=headers, timeout=10)
                 if status_request.status_code == 200:
-                    metadata_profiles = requests.get(f"{self.lidarr_address}/api/v1/metadataprofile", headers=headers, timeout=10).json()
-                    quality_profiles = requests.get(f"{self.lidarr_address}/api/v1/qualityprofile", headers=headers, timeout=10).json()
-                    root_folders = requests.get(f"{self.lidarr_address}/api/v1/rootfolder", headers=headers, timeout=10).json()
+                    metadata_profiles = self.http_client.get(f"{self.lidarr_address}/api/v1/metadataprofile", headers=headers, timeout=10).json()
+                    quality_profiles = self.http_client.get(f"{self.lidarr_address}/api/v1/qualityprofile", headers=headers, timeout=10).json()
+                    root_folders = self.http_client.get(f"{self.lidarr_address}/api/v1/rootfolder", headers=headers, timeout=10).json()
             data = {
                 "lidarr_address": self.lidarr_address,
                 "lidarr_api_key": self.lidarr_api_key,
@@ -314,26 +1499,28 @@ class DataHandler:
                 "search_for_missing_albums": self.search_for_missing_albums,
                 "auto_start": self.auto_start,
                 "auto_start_delay": self.auto_start_delay,
+                "auto_refresh_interval_hours": self.auto_refresh_interval_hours,
                 "root_folders": root_folders,
                 "quality_profiles": quality_profiles,
                 "metadata_profiles": metadata_profiles,
             }
-            socketio.emit("settingsLoaded", data)
+            socketio.emit("settingsLoaded", data, to=sid)
         except Exception as e:
             self.lidify_logger.error(f"Failed to load settings: {type(e)} - {str(e)}")
 
-    def test_settings(self, data):
+    def test_settings(self, sid, data):
         try:
+            self.ensure_services()
             address = data["lidarr_address"]
             key = data["lidarr_api_key"]
             headers = {"X-Api-Key": key}
-            status_request = requests.get(f"{address}/api/v1/system/status", headers=headers, timeout=10)
+            status_request = self.http_client.get(f"{address}/api/v1/system/status", headers=headers, timeout=10)
             if status_request.status_code != 200:
                 response_data = {"success": False}
-                socketio.emit("settingsTested", data)
-            metadata_profiles = requests.get(f"{address}/api/v1/metadataprofile", headers=headers, timeout=10).json()
-            quality_profiles = requests.get(f"{address}/api/v1/qualityprofile", headers=headers, timeout=10).json()
-            root_folders = requests.get(f"{address}/api/v1/rootfolder", headers=headers, timeout=10).json()
+                socketio.emit("settingsTested", data, to=sid)
+            metadata_profiles = self.http_client.get(f"{address}/api/v1/metadataprofile", headers=headers, timeout=10).json()
+            quality_profiles = self.http_client.get(f"{address}/api/v1/qualityprofile", headers=headers, timeout=10).json()
+            root_folders = self.http_client.get(f"{address}/api/v1/rootfolder", headers=headers, timeout=10).json()
             response_data = {
                 "success": True,
                 "root_folders": root_folders,
@@ -343,11 +1530,11 @@ class DataHandler:
                 "metadata_profile_id": self.metadata_profile_id,
                 "quality_profile_id": self.quality_profile_id,
             }
-            socketio.emit("settingsTested", response_data)
+            socketio.emit("settingsTested", response_data, to=sid)
         except Exception as e:
             self.lidify_logger.error(f"Testing connection to Lidarr failed: {type(e)} - {str(e)}")
             response_data = {"success": False}
-            socketio.emit("settingsTested", response_data)
+            socketio.emit("settingsTested", response_data, to=sid)
 
     def update_settings(self, data):
         try:
@@ -360,6 +1547,7 @@ class DataHandler:
             self.search_for_missing_albums = data["search_for_missing_albums"]
             self.auto_start = data["auto_start"]
             self.auto_start_delay = int(data["auto_start_delay"])
+            self.auto_refresh_interval_hours = int(data["auto_refresh_interval_hours"])
             if self.lidarr_api_timeout < 10:
                 self.lidarr_api_timeout = 10
             elif self.lidarr_api_timeout > 300:
@@ -368,9 +1556,24 @@ class DataHandler:
                 self.auto_start_delay = 10
             elif self.auto_start_delay > 120:
                 self.auto_start_delay = 120
+            if self.auto_refresh_interval_hours < 0:
+                self.auto_refresh_interval_hours = 0
+            elif self.auto_refresh_interval_hours > 168:
+                self.auto_refresh_interval_hours = 168
+            self.schedule_auto_refresh(self.auto_refresh_interval_hours * 3600)
         except Exception as e:
             self.lidify_logger.error(f"Failed to update settings: {type(e)} - {str(e)}")
 
+    def clear_cache(self, sid):
+        try:
+            self.ensure_services()
+            stats = self.listenbrainz_cache.stats()
+            self.listenbrainz_cache.clear()
+            self.lidify_logger.info(f"Cleared ListenBrainz cache: {stats}")
+            socketio.emit("new_toast_msg", {"title": "Cache Cleared", "message": f"Removed {stats["similar_artists_entries"] + stats["popularity_entries"]} cached entries."}, to=sid)
+        except Exception as e:
+            self.lidify_logger.error(f"Failed to clear cache: {type(e)} - {str(e)}")
+
     def format_numbers(self, count):
         if count >= 1000000:
             return f"{count / 1000000:.1f}M"
@@ -379,90 +1582,142 @@ class DataHandler:
         else:
             return count
 
+    def config_settings(self):
+        return {
+            "lidarr_address": self.lidarr_address,
+            "lidarr_api_key": self.lidarr_api_key,
+            "root_folder_path": self.root_folder_path,
+            "lidarr_api_timeout": float(self.lidarr_api_timeout),
+            "quality_profile_id": self.quality_profile_id,
+            "metadata_profile_id": self.metadata_profile_id,
+            "search_for_missing_albums": self.search_for_missing_albums,
+            "dry_run_adding_to_lidarr": self.dry_run_adding_to_lidarr,
+            "auto_start": self.auto_start,
+            "auto_start_delay": self.auto_start_delay,
+            "auto_refresh_interval_hours": self.auto_refresh_interval_hours,
+            "popularity_batch_size": self.popularity_batch_size,
+            "cache_ttl_hours": self.cache_ttl_hours,
+            "cache_max_entries": self.cache_max_entries,
+            "similar_artists_chunk_size": self.similar_artists_chunk_size,
+            "listenbrainz_workers": self.listenbrainz_workers,
+            "listenbrainz_api_timeout": self.listenbrainz_api_timeout,
+            "listenbrainz_max_retries": self.listenbrainz_max_retries,
+            "http_pool_size": self.http_pool_size,
+            "http_connect_timeout": self.http_connect_timeout,
+            "add_queue_max_size": self.add_queue_max_size,
+            "max_concurrent_searches": self.max_concurrent_searches,
+            "reconnect_grace_seconds": self.reconnect_grace_seconds,
+            "emit_batch_size": self.emit_batch_size,
+            "recommendation_limit": self.recommendation_limit,
+            "ranking_max_candidates": self.ranking_max_candidates,
+        }
+
     def save_config_to_file(self):
         try:
-            with open(self.settings_config_file, "w") as json_file:
-                json.dump(
-                    {
-                        "lidarr_address": self.lidarr_address,
-                        "lidarr_api_key": self.lidarr_api_key,
-                        "root_folder_path": self.root_folder_path,
-                        "lidarr_api_timeout": float(self.lidarr_api_timeout),
-                        "quality_profile_id": self.quality_profile_id,
-                        "metadata_profile_id": self.metadata_profile_id,
-                        "search_for_missing_albums": self.search_for_missing_albums,
-                        "dry_run_adding_to_lidarr": self.dry_run_adding_to_lidarr,
-                        "auto_start": self.auto_start,
-                        "auto_start_delay": self.auto_start_delay,
-                    },
-                    json_file,
-                    indent=4,
-                )
+            write_json_file(self.settings_config_file, self.config_settings(), indent=4)
 
         except Exception as e:
             self.lidify_logger.error(f"Error Saving Config: {type(e)} - {str(e)}")
 
 app = Flask(__name__)
 app.secret_key = "secret_key"
-socketio = SocketIO(app)
+# Only use gevent when it has been monkey-patched in (gunicorn's worker or a direct run), otherwise background tasks would block each other.
+socketio = SocketIO(app, async_mode="gevent" if gevent_patched() else "threading")
 data_handler = DataHandler()
 
+def start_services():
+    try:
+        data_handler.ensure_services()
+    except Exception:
+        # Already logged by ensure_services, and the next request that needs the services tries again.
+        pass
+
+socketio.start_background_task(start_services)
+
 @app.route("/")
 def home():
     return render_template("base.html")
 
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 @socketio.on("side_bar_opened")
+@metrics.timed("listenarr_socket_handler_seconds", event="side_bar_opened")
 def side_bar_opened():
-    if data_handler.lidarr_items:
-        ret = {"Status": "Success", "Data": data_handler.lidarr_items, "Running": not data_handler.stop_event.is_set()}
-        socketio.emit("lidarr_sidebar_update", ret)
+    data_handler.side_bar_opened(request.sid)
+
+@socketio.on("lidarr_page")
+@metrics.timed("listenarr_socket_handler_seconds", event="lidarr_page")
+def lidarr_page(data):
+    data_handler.sidebar_page(request.sid, data)
+
+@socketio.on("lidarr_select")
+@metrics.timed("listenarr_socket_handler_seconds", event="lidarr_select")
+def lidarr_select(data):
+    data_handler.select_artists(request.sid, data)
 
 @socketio.on("get_lidarr_artists")
+@metrics.timed("listenarr_socket_handler_seconds", event="get_lidarr_artists")
 def get_lidarr_artists():
-    thread = threading.Thread(target=data_handler.get_artists_from_lidarr, name="Lidarr_Thread")
-    thread.daemon = True
-    thread.start()
+    socketio.start_background_task(data_handler.get_artists_from_lidarr, request.sid)
 
 @socketio.on("finder")
+@metrics.timed("listenarr_socket_handler_seconds", event="finder")
 def find_similar_artists(data):
-    thread = threading.Thread(target=data_handler.find_similar_artists, args=(data,), name="Find_Similar_Thread")
-    thread.daemon = True
-    thread.start()
+    socketio.start_background_task(data_handler.start, request.sid, data)
 
 @socketio.on("adder")
+@metrics.timed("listenarr_socket_handler_seconds", event="adder")
 def add_artists(data):
-    thread = threading.Thread(target=data_handler.add_artists, args=(data,), name="Add_Artists_Thread")
-    thread.daemon = True
-    thread.start()
+    data_handler.queue_artists(request.sid, data)
+
+@socketio.on("bulk_adder")
+@metrics.timed("listenarr_socket_handler_seconds", event="bulk_adder")
+def bulk_add_artists(data):
+    data_handler.queue_artists(request.sid, data)
 
 @socketio.on("connect")
-def connection():
-    data_handler.connection()
+@metrics.timed("listenarr_socket_handler_seconds", event="connect")
+def connection(auth=None):
+    session_id = auth.get("session_id") if isinstance(auth, dict) else None
+    data_handler.connection(request.sid, session_id if isinstance(session_id, str) and 0 < len(session_id) <= 64 else None)
 
 @socketio.on("disconnect")
-def disconnection():
-    data_handler.disconnection()
+@metrics.timed("listenarr_socket_handler_seconds", event="disconnect")
+def disconnection(reason=None):
+    data_handler.disconnection(request.sid)
 
 @socketio.on("load_settings")
+@metrics.timed("listenarr_socket_handler_seconds", event="load_settings")
 def load_settings():
-    data_handler.load_settings()
+    data_handler.load_settings(request.sid)
 
 @socketio.on("test_settings")
+@metrics.timed("listenarr_socket_handler_seconds", event="test_settings")
 def test_settings(data):
-    data_handler.test_settings(data)
+    data_handler.test_settings(request.sid, data)
 
 @socketio.on("update_settings")
+@metrics.timed("listenarr_socket_handler_seconds", event="update_settings")
 def update_settings(data):
     data_handler.update_settings(data)
     data_handler.save_config_to_file()
 
+@socketio.on("clear_cache")
+@metrics.timed("listenarr_socket_handler_seconds", event="clear_cache")
+def clear_cache():
+    data_handler.clear_cache(request.sid)
+
 @socketio.on("start_req")
+@metrics.timed("listenarr_socket_handler_seconds", event="start_req")
 def starter(data):
-    data_handler.start(data)
+    data_handler.start(request.sid, data)
 
 @socketio.on("stop_req")
+@metrics.timed("listenarr_socket_handler_seconds", event="stop_req")
 def stopper():
-    data_handler.stop_event.set()
+    data_handler.stop(request.sid)
 
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=5000)
@@ -2,12 +2,18 @@ var return_to_top = document.getElementById("return-to-top");
 
 var lidarr_get_artists_button = document.getElementById('lidarr-get-artists-button');
 var start_stop_button = document.getElementById('start-stop-button');
+var add_all_button = document.getElementById('add-all-button');
+var force_refresh_checkbox = document.getElementById('force-refresh');
 var lidarr_status = document.getElementById('lidarr-status');
 var lidarr_spinner = document.getElementById('lidarr-spinner');
 
 var lidarr_item_list = document.getElementById("lidarr-item-list");
+var lidarr_item_spacer = document.getElementById("lidarr-item-spacer");
+var lidarr_item_window = document.getElementById("lidarr-item-window");
+var lidarr_filter_input = document.getElementById("lidarr-filter");
 var lidarr_select_all_checkbox = document.getElementById("lidarr-select-all");
 var lidarr_select_all_container = document.getElementById("lidarr-select-all-container");
+var artist_row = document.getElementById('artist-row');
 
 var config_modal = document.getElementById('config-modal');
 var lidarr_sidebar = document.getElementById('lidarr-sidebar');
@@ -15,6 +21,7 @@ var lidarr_sidebar = document.getElementById('lidarr-sidebar');
 var save_message = document.getElementById("save-message");
 var save_settings_button = document.getElementById("save-settings-button");
 var test_settings_button = document.getElementById("test-settings-button")
+var clear_cache_button = document.getElementById("clear-cache-button");
 const lidarr_address = document.getElementById("lidarr-address");
 const lidarr_api_key = document.getElementById("lidarr-api-key");
 const lidarr_api_timeout = document.getElementById("lidarr-api-timeout");
@@ -24,81 +31,275 @@ const metadata_profile_id = document.getElementById("metadata-profile-id");
 const search_for_missing_albums = document.getElementById("search-for-missing-albums");
 const auto_start = document.getElementById("auto-start");
 const auto_start_delay = document.getElementById("auto-start-delay");
+const auto_refresh_interval = document.getElementById("auto-refresh-interval");
+
+const LIDARR_ROW_HEIGHT = 28;
+const LIDARR_PAGE_SIZE = 100;
+const LIDARR_OVERSCAN_ROWS = 10;
+const ARTIST_OVERSCAN_ROWS = 2;
+const LOCKED_STATUSES = ["Added", "Already in Lidarr", "Failed to Add", "Invalid Path", "Queued", "Adding"];
+
+var lidarr_total = 0;
+var lidarr_selected = 0;
+var lidarr_filter = "";
+var lidarr_pages = {};
+var lidarr_requested_pages = {};
+var lidarr_running = false;
+var lidarr_render_pending = false;
+var lidarr_filter_timer = null;
+
+var recommended_artists = [];
+var recommended_artists_by_mbid = {};
+var artist_row_height = 0;
+var artist_render_pending = false;
+var artist_render_key = "";
+
+function get_session_id() {
+    var session_id = sessionStorage.getItem("listenarr_session_id");
+    if (!session_id) {
+        session_id = window.crypto && crypto.randomUUID ? crypto.randomUUID() : Date.now().toString(36) + Math.random().toString(36).slice(2);
+        sessionStorage.setItem("listenarr_session_id", session_id);
+    }
+    return session_id;
+}
 
-var lidarr_items = [];
-var socket = io();
+var socket = io({ auth: { session_id: get_session_id() } });
 
-function check_if_all_selected() {
-    var checkboxes = document.querySelectorAll('input[name="lidarr-item"]');
-    var all_checked = true;
-    for (var i = 0; i < checkboxes.length; i++) {
-        if (!checkboxes[i].checked) {
-            all_checked = false;
-            break;
-        }
+function set_lidarr_total(total) {
+    lidarr_total = total;
+    lidarr_item_spacer.style.height = (lidarr_total * LIDARR_ROW_HEIGHT) + "px";
+}
+
+function reset_lidarr_list(total) {
+    lidarr_pages = {};
+    lidarr_requested_pages = {};
+    set_lidarr_total(total);
+    schedule_lidarr_render();
+}
+
+function request_lidarr_page(page) {
+    if (!lidarr_requested_pages[page]) {
+        lidarr_requested_pages[page] = true;
+        socket.emit("lidarr_page", { "offset": page * LIDARR_PAGE_SIZE, "limit": LIDARR_PAGE_SIZE, "filter": lidarr_filter });
+    }
+}
+
+function load_lidarr_filter() {
+    lidarr_pages = {};
+    lidarr_requested_pages = {};
+    lidarr_item_list.scrollTop = 0;
+    request_lidarr_page(0);
+}
+
+function lidarr_item_at(index) {
+    var page = lidarr_pages[Math.floor(index / LIDARR_PAGE_SIZE)];
+    return page ? page[index % LIDARR_PAGE_SIZE] : undefined;
+}
+
+function create_lidarr_row(index, item) {
+    var div = document.createElement("div");
+    div.className = "form-check lidarr-row";
+
+    var input = document.createElement("input");
+    input.type = "checkbox";
+    input.className = "form-check-input";
+    input.id = "lidarr-" + index;
+    input.name = "lidarr-item";
+
+    var label = document.createElement("label");
+    label.className = "form-check-label";
+    label.htmlFor = "lidarr-" + index;
+
+    if (item) {
+        input.value = item.mbid;
+        input.checked = item.checked;
+        input.disabled = lidarr_running;
+        label.textContent = item.name;
+        label.title = item.name;
+        input.addEventListener("change", function () {
+            item.checked = input.checked;
+            socket.emit("lidarr_select", { "mbid": item.mbid, "checked": input.checked, "filter": lidarr_filter });
+        });
+    }
+    else {
+        input.disabled = true;
+        label.textContent = "Loading...";
+        label.classList.add("text-muted");
+    }
+
+    div.appendChild(input);
+    div.appendChild(label);
+    return div;
+}
+
+function render_lidarr_list() {
+    lidarr_render_pending = false;
+    var scroll_top = lidarr_item_list.scrollTop;
+    var first = Math.max(0, Math.floor(scroll_top / LIDARR_ROW_HEIGHT) - LIDARR_OVERSCAN_ROWS);
+    var last = Math.min(lidarr_total, Math.ceil((scroll_top + lidarr_item_list.clientHeight) / LIDARR_ROW_HEIGHT) + LIDARR_OVERSCAN_ROWS);
+
+    for (var page = Math.floor(first / LIDARR_PAGE_SIZE); page <= Math.floor((last - 1) / LIDARR_PAGE_SIZE); page++) {
+        request_lidarr_page(page);
+    }
+
+    var fragment = document.createDocumentFragment();
+    for (var i = first; i < last; i++) {
+        fragment.appendChild(create_lidarr_row(i, lidarr_item_at(i)));
+    }
+    lidarr_item_window.style.top = (first * LIDARR_ROW_HEIGHT) + "px";
+    lidarr_item_window.replaceChildren(fragment);
+}
+
+function schedule_lidarr_render() {
+    if (!lidarr_render_pending) {
+        lidarr_render_pending = true;
+        window.requestAnimationFrame(render_lidarr_list);
     }
-    lidarr_select_all_checkbox.checked = all_checked;
 }
 
 function load_lidarr_data(response) {
-    var every_check_box = document.querySelectorAll('input[name="lidarr-item"]');
+    lidarr_running = response.Running;
     if (response.Running) {
         start_stop_button.classList.remove('btn-success');
         start_stop_button.classList.add('btn-warning');
         start_stop_button.textContent = "Stop";
-        every_check_box.forEach(item => {
-            item.disabled = true;
-        });
         lidarr_select_all_checkbox.disabled = true;
         lidarr_get_artists_button.disabled = true;
+        force_refresh_checkbox.disabled = true;
     } else {
         start_stop_button.classList.add('btn-success');
         start_stop_button.classList.remove('btn-warning');
         start_stop_button.textContent = "Start";
-        every_check_box.forEach(item => {
-            item.disabled = false;
-        });
         lidarr_select_all_checkbox.disabled = false;
         lidarr_get_artists_button.disabled = false;
+        force_refresh_checkbox.disabled = false;
     }
-    check_if_all_selected();
+    schedule_lidarr_render();
 }
 
-function append_artists(artists) {
-    var artist_row = document.getElementById('artist-row');
+function set_running(running) {
+    load_lidarr_data({ "Running": running });
+}
+
+function is_addable(artist) {
+    return !LOCKED_STATUSES.includes(artist.Status);
+}
+
+function apply_artist_status(card_body, add_button, status) {
+    card_body.classList.remove('status-green', 'status-red', 'status-blue');
+    if (status === "Added" || status === "Already in Lidarr") {
+        card_body.classList.add('status-green');
+        add_button.classList.remove('btn-primary');
+        add_button.classList.add('btn-secondary');
+        add_button.disabled = true;
+        add_button.textContent = status;
+    } else if (status === "Failed to Add" || status === "Invalid Path") {
+        card_body.classList.add('status-red');
+        add_button.classList.remove('btn-primary');
+        add_button.classList.add('btn-danger');
+        add_button.disabled = true;
+        add_button.textContent = status;
+    } else if (status === "Queued" || status === "Adding") {
+        card_body.classList.add('status-blue');
+        add_button.disabled = true;
+        add_button.textContent = status;
+    } else {
+        card_body.classList.add('status-blue');
+    }
+}
+
+function create_artist_card(template, artist) {
+    var clone = document.importNode(template.content, true);
+    var artist_col = clone.querySelector('.artist-column');
+    artist_col.dataset.mbid = artist.Mbid;
+
+    artist_col.querySelector('.card-title').textContent = artist.Name;
+    artist_col.querySelector('.card-title').title = artist.Name;
+    artist_col.querySelector('.similar-to').textContent = artist.Similar_To;
+    artist_col.querySelector('.similar-to').title = artist.Similar_To;
+    artist_col.querySelector('.add-to-lidarr-btn').addEventListener('click', function () {
+        add_to_lidarr(artist.Mbid);
+    });
+    artist_col.querySelector('.get-preview-btn').setAttribute("href", "https://listenbrainz.org/artist/" + artist.Mbid);
+    artist_col.querySelector('.followers').textContent = artist.Followers;
+    artist_col.querySelector('.popularity').textContent = artist.Popularity;
+    apply_artist_status(artist_col.querySelector('.card-body'), artist_col.querySelector('.add-to-lidarr-btn'), artist.Status);
+    return clone;
+}
+
+function artists_per_row() {
+    if (window.innerWidth >= 1400) {
+        return 6;
+    } else if (window.innerWidth >= 768) {
+        return 3;
+    }
+    return 1;
+}
+
+function create_spacer(height) {
+    var spacer = document.createElement("div");
+    spacer.className = "col-12";
+    spacer.style.height = height + "px";
+    return spacer;
+}
+
+function render_artists() {
+    artist_render_pending = false;
+    var per_row = artists_per_row();
+    var row_height = artist_row_height || 250;
+    var total_rows = Math.ceil(recommended_artists.length / per_row);
+    var row_top = artist_row.getBoundingClientRect().top + window.scrollY;
+    var first_row = Math.max(0, Math.floor((window.scrollY - row_top) / row_height) - ARTIST_OVERSCAN_ROWS);
+    var last_row = Math.min(total_rows, Math.ceil((window.scrollY + window.innerHeight - row_top) / row_height) + ARTIST_OVERSCAN_ROWS);
+    first_row = Math.min(first_row, last_row);
+
+    var render_key = [first_row, last_row, per_row, recommended_artists.length].join(",");
+    if (render_key === artist_render_key) {
+        return;
+    }
+    artist_render_key = render_key;
+
     var template = document.getElementById('artist-template');
+    var fragment = document.createDocumentFragment();
+    fragment.appendChild(create_spacer(first_row * row_height));
+    var end = Math.min(recommended_artists.length, last_row * per_row);
+    for (var i = first_row * per_row; i < end; i++) {
+        fragment.appendChild(create_artist_card(template, recommended_artists[i]));
+    }
+    fragment.appendChild(create_spacer((total_rows - last_row) * row_height));
+    artist_row.replaceChildren(fragment);
+
+    if (!artist_row_height) {
+        var card = artist_row.querySelector('.artist-column');
+        if (card) {
+            artist_row_height = card.offsetHeight + parseFloat(getComputedStyle(card).marginBottom);
+            schedule_artist_render(true);
+        }
+    }
+}
 
-    artists.forEach(function (artist) {
-        var clone = document.importNode(template.content, true);
-        var artist_col = clone.querySelector('#artist-column');
+function schedule_artist_render(force) {
+    if (force) {
+        artist_render_key = "";
+    }
+    if (!artist_render_pending) {
+        artist_render_pending = true;
+        window.requestAnimationFrame(render_artists);
+    }
+}
 
-        artist_col.querySelector('.card-title').textContent = artist.Name;
-        artist_col.querySelector('.similar-to').textContent = artist.Similar_To;
-        artist_col.querySelector('.add-to-lidarr-btn').addEventListener('click', function () {
-            add_to_lidarr(artist.Mbid);
-        });
-        artist_col.querySelector('.get-preview-btn').setAttribute("href", "https://listenbrainz.org/artist/" + artist.Mbid);
-        artist_col.querySelector('.followers').textContent = artist.Followers;
-        artist_col.querySelector('.popularity').textContent = artist.Popularity;
-
-        var add_button = artist_col.querySelector('.add-to-lidarr-btn');
-        if (artist.Status === "Added" || artist.Status === "Already in Lidarr") {
-            artist_col.querySelector('.card-body').classList.add('status-green');
-            add_button.classList.remove('btn-primary');
-            add_button.classList.add('btn-secondary');
-            add_button.disabled = true;
-            add_button.textContent = artist.Status;
-        } else if (artist.Status === "Failed to Add" || artist.Status === "Invalid Path") {
-            artist_col.querySelector('.card-body').classList.add('status-red');
-            add_button.classList.remove('btn-primary');
-            add_button.classList.add('btn-danger');
-            add_button.disabled = true;
-            add_button.textContent = artist.Status;
-        } else {
-            artist_col.querySelector('.card-body').classList.add('status-blue');
+function append_artists(artists) {
+    artists.forEach(function (artist) {
+        var existing = recommended_artists_by_mbid[artist.Mbid];
+        if (existing) {
+            Object.assign(existing, artist);
+        }
+        else {
+            recommended_artists_by_mbid[artist.Mbid] = artist;
+            recommended_artists.push(artist);
         }
-        artist_row.appendChild(clone);
     });
+    schedule_artist_render(true);
 }
 
 function add_to_lidarr(artist_name) {
@@ -110,6 +311,19 @@ function add_to_lidarr(artist_name) {
     }
 }
 
+function add_all_to_lidarr() {
+    var mbids = recommended_artists.filter(is_addable).map(artist => artist.Mbid);
+    if (mbids.length === 0) {
+        show_toast("Add Queue", "No recommended artists left to add.");
+    }
+    else if (socket.connected) {
+        socket.emit('bulk_adder', mbids);
+    }
+    else {
+        show_toast("Connection Lost", "Please reload to continue.");
+    }
+}
+
 function show_toast(header, message) {
     var toast_container = document.querySelector('.toast-container');
     var toast_template = document.getElementById('toast-template').cloneNode(true);
@@ -133,62 +347,68 @@ return_to_top.addEventListener("click", function () {
     window.scrollTo({ top: 0, behavior: "smooth" });
 });
 
+window.addEventListener("scroll", function () {
+    schedule_artist_render(false);
+});
+
+window.addEventListener("resize", function () {
+    artist_row_height = 0;
+    schedule_artist_render(true);
+    schedule_lidarr_render();
+});
+
+lidarr_item_list.addEventListener("scroll", function () {
+    schedule_lidarr_render();
+});
+
+lidarr_filter_input.addEventListener("input", function () {
+    clearTimeout(lidarr_filter_timer);
+    lidarr_filter_timer = setTimeout(function () {
+        lidarr_filter = lidarr_filter_input.value;
+        load_lidarr_filter();
+    }, 250);
+});
+
 lidarr_select_all_checkbox.addEventListener("change", function () {
     var is_checked = this.checked;
-    var checkboxes = document.querySelectorAll('input[name="lidarr-item"]');
-    checkboxes.forEach(function (checkbox) {
-        checkbox.checked = is_checked;
+    Object.values(lidarr_pages).forEach(function (page) {
+        page.forEach(function (item) {
+            item.checked = is_checked;
+        });
     });
+    socket.emit("lidarr_select", { "all": true, "checked": is_checked, "filter": lidarr_filter });
+    schedule_lidarr_render();
+});
+
+add_all_button.addEventListener('click', function () {
+    add_all_to_lidarr();
 });
 
 lidarr_get_artists_button.addEventListener('click', function () {
     lidarr_get_artists_button.disabled = true;
     lidarr_spinner.classList.remove('d-none');
     lidarr_status.textContent = "Accessing Lidarr API";
-    lidarr_item_list.innerHTML = '';
+    reset_lidarr_list(0);
     socket.emit("get_lidarr_artists");
 });
 
 start_stop_button.addEventListener('click', function () {
     var running_state = start_stop_button.textContent.trim() === "Start" ? true : false;
     if (running_state) {
-        start_stop_button.classList.remove('btn-success');
-        start_stop_button.classList.add('btn-warning');
-        start_stop_button.textContent = "Stop";
-        var checked_items = Array.from(document.querySelectorAll('input[name="lidarr-item"]:checked'))
-            .map(item => item.value);
-        document.querySelectorAll('input[name="lidarr-item"]').forEach(item => {
-            item.disabled = true;
-        });
-        lidarr_get_artists_button.disabled = true;
-        lidarr_select_all_checkbox.disabled = true;
-        socket.emit("start_req", checked_items);
-        if (checked_items.length > 0) {
+        set_running(true);
+        socket.emit("start_req", { "mbids": null, "force_refresh": force_refresh_checkbox.checked });
+        if (lidarr_selected > 0) {
             show_toast("Loading new artists");
         }
     }
     else {
-        start_stop_button.classList.add('btn-success');
-        start_stop_button.classList.remove('btn-warning');
-        start_stop_button.textContent = "Start";
-        document.querySelectorAll('input[name="lidarr-item"]').forEach(item => {
-            item.disabled = false;
-        });
-        lidarr_get_artists_button.disabled = false;
-        lidarr_select_all_checkbox.disabled = false;
+        set_running(false);
         socket.emit("stop_req");
     }
 });
 
 socket.on("finished_finding", () => {
-    start_stop_button.classList.add('btn-success');
-    start_stop_button.classList.remove('btn-warning');
-    start_stop_button.textContent = "Start";
-    document.querySelectorAll('input[name="lidarr-item"]').forEach(item => {
-        item.disabled = false;
-    });
-    lidarr_get_artists_button.disabled = false;
-    lidarr_select_all_checkbox.disabled = false;
+    set_running(false);
 });
 
 test_settings_button.addEventListener("click", () => {
@@ -201,6 +421,10 @@ test_settings_button.addEventListener("click", () => {
     });
 });
 
+clear_cache_button.addEventListener("click", () => {
+    socket.emit("clear_cache");
+});
+
 socket.on("settingsTested", (data) => {
     if (data["success"]) {
         test_settings_button.classList.remove("btn-warning");
@@ -257,6 +481,11 @@ save_settings_button.addEventListener("click", () => {
     } else if (auto_start_delay.value > 120) {
         auto_start_delay.value = 120;
     }
+    if (auto_refresh_interval.value < 0) {
+        auto_refresh_interval.value = 0;
+    } else if (auto_refresh_interval.value > 168) {
+        auto_refresh_interval.value = 168;
+    }
     socket.emit("update_settings", {
         "lidarr_address": lidarr_address.value,
         "lidarr_api_key": lidarr_api_key.value,
@@ -267,6 +496,7 @@ save_settings_button.addEventListener("click", () => {
         "search_for_missing_albums": search_for_missing_albums.checked,
         "auto_start": auto_start.checked,
         "auto_start_delay": auto_start_delay.value,
+        "auto_refresh_interval_hours": auto_refresh_interval.value,
     });
     save_message.style.display = "block";
     setTimeout(function () {
@@ -284,6 +514,7 @@ config_modal.addEventListener('show.bs.modal', function (event) {
         search_for_missing_albums.checked = settings.search_for_missing_albums;
         auto_start.checked = settings.auto_start;
         auto_start_delay.value = settings.auto_start_delay;
+        auto_refresh_interval.value = settings.auto_refresh_interval_hours;
         root_folder_path.options.length = 0;
         metadata_profile_id.options.length = 0;
         quality_profile_id.options.length = 0;
@@ -323,44 +554,17 @@ lidarr_sidebar.addEventListener('show.bs.offcanvas', function (event) {
     socket.emit("side_bar_opened");
 });
 
+lidarr_sidebar.addEventListener('shown.bs.offcanvas', function (event) {
+    schedule_lidarr_render();
+});
+
 socket.on("lidarr_sidebar_update", (response) => {
     if (response.Status == "Success") {
         lidarr_status.textContent = "Lidarr List Retrieved";
-        lidarr_items = response.Data;
-        lidarr_item_list.innerHTML = '';
+        lidarr_selected = response.Selected;
         lidarr_select_all_container.classList.remove('d-none');
-
-        for (var i = 0; i < lidarr_items.length; i++) {
-            var item = lidarr_items[i];
-
-            var div = document.createElement("div");
-            div.className = "form-check";
-
-            var input = document.createElement("input");
-            input.type = "checkbox";
-            input.className = "form-check-input";
-            input.id = "lidarr-" + i;
-            input.name = "lidarr-item";
-            input.value = item.mbid;
-
-            if (item.checked) {
-                input.checked = true;
-            }
-
-            var label = document.createElement("label");
-            label.className = "form-check-label";
-            label.htmlFor = "lidarr-" + i;
-            label.textContent = item.name;
-
-            input.addEventListener("change", function () {
-                check_if_all_selected();
-            });
-
-            div.appendChild(input);
-            div.appendChild(label);
-
-            lidarr_item_list.appendChild(div);
-        }
+        set_lidarr_total(lidarr_filter ? lidarr_total : response.Total);
+        load_lidarr_filter();
     }
     else {
         lidarr_status.textContent = response.Code;
@@ -370,36 +574,31 @@ socket.on("lidarr_sidebar_update", (response) => {
     load_lidarr_data(response);
 });
 
+socket.on("lidarr_page_loaded", (page) => {
+    if (page.Filter !== lidarr_filter) {
+        return;
+    }
+    if (page.Total !== lidarr_total) {
+        set_lidarr_total(page.Total);
+    }
+    lidarr_pages[Math.floor(page.Offset / LIDARR_PAGE_SIZE)] = page.Items;
+    lidarr_select_all_checkbox.checked = page.All_Selected;
+    schedule_lidarr_render();
+});
+
+socket.on("lidarr_selection", (selection) => {
+    lidarr_selected = selection.Selected;
+    if (selection.Filter === lidarr_filter) {
+        lidarr_select_all_checkbox.checked = selection.All_Selected;
+    }
+});
+
 socket.on("refresh_artist", (artist) => {
-    var artist_cards = document.querySelectorAll('#artist-column');
-    artist_cards.forEach(function (card) {
-        var card_body = card.querySelector('.card-body');
-        var card_artist_name = card_body.querySelector('.card-title').textContent.trim();
-
-        if (card_artist_name === artist.Name) {
-            card_body.classList.remove('status-green', 'status-red', 'status-blue');
-
-            var add_button = card_body.querySelector('.add-to-lidarr-btn');
-
-            if (artist.Status === "Added" || artist.Status === "Already in Lidarr") {
-                card_body.classList.add('status-green');
-                add_button.classList.remove('btn-primary');
-                add_button.classList.add('btn-secondary');
-                add_button.disabled = true;
-                add_button.textContent = artist.Status;
-            } else if (artist.Status === "Failed to Add" || artist.Status === "Invalid Path") {
-                card_body.classList.add('status-red');
-                add_button.classList.remove('btn-primary');
-                add_button.classList.add('btn-danger');
-                add_button.disabled = true;
-                add_button.textContent = artist.Status;
-            } else {
-                card_body.classList.add('status-blue');
-                add_button.disabled = false;
-            }
-            return;
-        }
-    });
+    var existing = recommended_artists_by_mbid[artist.Mbid];
+    if (existing) {
+        existing.Status = artist.Status;
+        schedule_artist_render(true);
+    }
 });
 
 socket.on('more_artists_loaded', function (data) {
@@ -420,11 +619,9 @@ socket.on("disconnect", function () {
 });
 
 function clear_all() {
-    var artist_row = document.getElementById('artist-row');
-    var artist_cards = artist_row.querySelectorAll('#artist-column');
-    artist_cards.forEach(function (card) {
-        card.remove();
-    });
+    recommended_artists = [];
+    recommended_artists_by_mbid = {};
+    schedule_artist_render(true);
 }
 
 var preview_modal;